@@ -0,0 +1,73 @@
+"""
+Measures the memory used by listings as dicts and as slotted Listing records.
+
+A synthetic JSONL feed is written to a temporary file, then read back four ways:
+as parsed dicts, as Listing records, and loaded into a DataManager from each.
+Sizes are traced with tracemalloc and scaled to a million listings.
+
+Usage (from the ai/ directory):
+    python -m benchmarks.bench_listing_memory [--listings 200000]
+"""
+import argparse
+import gc
+import json
+import os
+import tempfile
+import tracemalloc
+
+from benchmarks.corpus import make_listings
+from src.database.data_manager import DataManager
+from src.database.listing_loader import load_listing_feed, read_listing_feed
+
+
+def read_dicts(path):
+    """The dict layout: one json.loads per line, every value its own object."""
+    with open(path, 'rb') as feed:
+        return [json.loads(line) for line in feed]
+
+
+def stream_into_data_manager(path):
+    data_manager = DataManager(listings=[])
+    load_listing_feed(path, data_manager)
+    return data_manager
+
+
+def _traced(fn):
+    """Runs fn and returns (result, bytes still allocated by it, peak bytes allocated while it ran)."""
+    gc.collect()
+    tracemalloc.start()
+    result = fn()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--listings", type=int, default=200_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "listings.jsonl")
+        with open(path, 'w') as feed:
+            for listing in make_listings(args.listings):
+                feed.write(json.dumps(listing) + "\n")
+
+        cases = [
+            ("dicts (json.loads per line)", lambda: read_dicts(path)),
+            ("Listing records (read_listing_feed)", lambda: list(read_listing_feed(path))),
+            ("DataManager from dicts", lambda: DataManager(listings=read_dicts(path))),
+            ("DataManager via load_listing_feed", lambda: stream_into_data_manager(path)),
+        ]
+
+        print(f"{args.listings} listings, MB per million listings")
+        print(f"{'layout':<40}{'retained':>12}{'peak':>12}")
+        for label, fn in cases:
+            result, current, peak = _traced(fn)
+            scale = 1e6 / args.listings / 2**20
+            print(f"{label:<40}{current * scale:>12.1f}{peak * scale:>12.1f}")
+            del result
+
+
+if __name__ == "__main__":
+    main()
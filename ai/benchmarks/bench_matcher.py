@@ -0,0 +1,89 @@
+"""
+Benchmarks find_best_matches (indexed top-k) and find_best_matches_vectorized against the
+previous full-scan, sort-everything implementation, then find_best_matches_batch against
+a loop of find_best_matches calls.
+
+Usage (from the ai/ directory):
+    python -m benchmarks.bench_matcher [--listings 200000] [--repeat 20] [--k 3] [--batch 200]
+"""
+import argparse
+import random
+import time
+
+from benchmarks.corpus import PRODUCTS, make_listings
+from src.database.columnar_store import ColumnarListingStore
+from src.database.data_manager import DataManager
+from src.matching.matcher import find_best_matches, find_best_matches_batch, score_listing
+from src.matching.vectorized_matcher import find_best_matches_vectorized
+
+
+def baseline_find_best_matches(user_request, database, role, k=3):
+    """The previous implementation: scan every listing, build every match, sort them all, slice."""
+    search_type = "selling" if role == "buyer" else "buying"
+    target_product = user_request['product']
+    matches = []
+    for listing in database:
+        if listing['type'] == search_type and listing['product_name'].lower() == target_product.lower():
+            score = score_listing(listing, user_request, role)
+            if score > 0:
+                matches.append({'listing': listing, 'score': score})
+    if role == "buyer":
+        matches.sort(key=lambda x: (-x['score'], x['listing']['price_per_unit']))
+    else:
+        matches.sort(key=lambda x: (-x['score'], -x['listing']['price_per_unit']))
+    return matches[:k]
+
+
+def _time(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--listings", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--batch", type=int, default=200, help="requests per find_best_matches_batch call")
+    args = parser.parse_args()
+
+    listings = make_listings(args.listings)
+    data_manager = DataManager(listings=listings)
+    store = ColumnarListingStore(listings)
+
+    requests = [
+        ("buyer", {'product': 'apples', 'quantity': 100.0, 'unit': 'kg', 'price': 10.0, 'currency': 'rupees'}),
+        ("seller", {'product': 'apples', 'quantity': 100.0, 'unit': 'kg', 'price': 10.0, 'currency': 'rupees'}),
+        ("buyer", {'product': 'rice', 'quantity': None, 'unit': None, 'price': 8.0, 'currency': 'rupees'}),
+        ("buyer", {'product': 'tea', 'quantity': 1000.0, 'unit': 'kg', 'price': 1.0, 'currency': 'rupees'}),
+    ]
+
+    print(f"{args.listings} listings, k={args.k}, {args.repeat} repeats")
+    print(f"{'request':<48}{'baseline ms':>14}{'top-k ms':>12}{'speedup':>10}{'numpy ms':>12}{'speedup':>10}")
+    for role, request in requests:
+        base_t, base = _time(lambda: baseline_find_best_matches(request, listings, role, args.k), args.repeat)
+        new_t, new = _time(lambda: find_best_matches(request, data_manager, role, args.k), args.repeat)
+        vec_t, vec = _time(lambda: find_best_matches_vectorized(request, store, role, args.k), args.repeat)
+        assert [m['score'] for m in base] == [m['score'] for m in new] == [m['score'] for m in vec]
+        label = f"{role}: {request['product']} q={request['quantity']} p={request['price']}"
+        print(f"{label:<48}{base_t * 1e3:>14.2f}{new_t * 1e3:>12.3f}{base_t / new_t:>9.1f}x"
+              f"{vec_t * 1e3:>12.3f}{base_t / vec_t:>9.1f}x")
+
+    rng = random.Random(0)
+    batch = [({'product': rng.choice(PRODUCTS), 'quantity': rng.choice([None, 50.0, 100.0, 1000.0]), 'unit': 'kg',
+               'price': rng.choice([None, 8.0, 10.0, 15.0]), 'currency': 'rupees'}, rng.choice(["buyer", "seller"]))
+             for _ in range(args.batch)]
+    print(f"\n{'batch of mixed requests':<48}{'loop ms':>14}{'batch ms':>12}{'speedup':>10}")
+    for size in sorted({1, args.batch}):
+        loop_t, loop = _time(lambda: [find_best_matches(request, data_manager, role, args.k)
+                                      for request, role in batch[:size]], args.repeat)
+        batch_t, batched = _time(lambda: find_best_matches_batch(batch[:size], data_manager, args.k), args.repeat)
+        assert [[m['score'] for m in matches] for matches in loop] == \
+            [[m['score'] for m in matches] for matches in batched]
+        print(f"{f'{size} request(s)':<48}{loop_t * 1e3:>14.3f}{batch_t * 1e3:>12.3f}{loop_t / batch_t:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Measures AdvancedNERExtractor throughput (messages/sec), one extract() call per
+message versus batched extract_many(), and how much traffic the regex fast path absorbs.
+
+Usage (from the ai/ directory):
+    python -m benchmarks.bench_ner [--messages 2000] [--batch-size 256] [--n-process 1] [--model en_core_web_sm]
+
+--model blank:en runs without a trained spaCy model.
+"""
+import argparse
+import time
+
+from benchmarks.corpus import CONFIG_PATH, make_utterances
+from src.nlp.ner_extractor import DEFAULT_MODEL, AdvancedNERExtractor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--n-process", type=int, default=1)
+    parser.add_argument("--no-fast-path", action="store_true", help="send every message through spaCy")
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    args = parser.parse_args()
+
+    texts = make_utterances(args.messages)
+    # Uncached, or extract_many would be answered from what the extract() pass cached
+    extractor = AdvancedNERExtractor(config_path=CONFIG_PATH, use_fast_path=not args.no_fast_path,
+                                     model_name=args.model, cache_size=0)
+    print(f"{len(texts)} messages, model {args.model}, pipeline {extractor.nlp.pipe_names}, disabled {extractor.disabled_components}")
+
+    extractor.extract(texts[0]) # warm up
+
+    start = time.perf_counter()
+    single = [extractor.extract(text) for text in texts]
+    single_t = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batched = extractor.extract_many(texts, batch_size=args.batch_size, n_process=args.n_process)
+    batched_t = time.perf_counter() - start
+
+    mismatches = sum(a != b for a, b in zip(single, batched))
+    print(f"{'single extract()':<28}{len(texts) / single_t:>12.0f} msg/s")
+    print(f"{'extract_many()':<28}{len(texts) / batched_t:>12.0f} msg/s  ({single_t / batched_t:.1f}x)")
+    if extractor.fast_path is not None:
+        print(f"fast path: {extractor.fast_path.stats()}")
+    if mismatches:
+        print(f"WARNING: {mismatches} messages extracted differently")
+
+
+if __name__ == "__main__":
+    main()
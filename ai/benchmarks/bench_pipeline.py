@@ -0,0 +1,117 @@
+"""
+Benchmark suite for the extract -> match -> respond pipeline.
+
+Times AdvancedNERExtractor.extract, find_best_matches and a full Chatbot turn
+separately, over the same reproducible utterance corpus, at each catalog size.
+The turn benchmark runs the chatbot as deployed (caches on) with its timing hooks
+enabled and prints their per-stage breakdown.
+
+Usage (from the ai/ directory):
+    python -m benchmarks.bench_pipeline [--sizes 1k,100k] [--utterances 2000] [--model en_core_web_sm]
+                                        [--profile turns.prof]
+
+--sizes 1k,100k,1m runs the full suite; --model blank:en runs without a trained spaCy model.
+"""
+import argparse
+import random
+import time
+
+from benchmarks.corpus import CONFIG_PATH, LISTING_SIZES, listing_count, load_vocabulary, make_listings, \
+    make_utterances
+from src.database.data_manager import DataManager
+from src.instrumentation.timing import PipelineProfiler, StageTimings
+from src.main import ChatSession, Chatbot
+from src.matching.matcher import find_best_matches
+from src.nlp.ner_extractor import DEFAULT_MODEL, AdvancedNERExtractor
+
+
+def measure(fn, items):
+    """Calls fn on every item and returns the per-call latencies in seconds."""
+    latencies = []
+    for item in items:
+        start = time.perf_counter()
+        fn(item)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def summarize(latencies):
+    ordered = sorted(latencies)
+    total = sum(ordered)
+    return {
+        'ops': len(ordered),
+        'ops_per_s': len(ordered) / total if total else 0.0,
+        'mean_us': total / len(ordered) * 1e6,
+        'p50_us': ordered[len(ordered) // 2] * 1e6,
+        'p99_us': ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1e6,
+    }
+
+
+def print_row(benchmark, size, latencies):
+    stats = summarize(latencies)
+    print(f"{benchmark:<12}{size:>8}{stats['ops']:>8}{stats['ops_per_s']:>12.0f}"
+          f"{stats['mean_us']:>12.1f}{stats['p50_us']:>12.1f}{stats['p99_us']:>12.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="1k,100k", help=f"catalog sizes, from {', '.join(LISTING_SIZES)} or numbers")
+    parser.add_argument("--utterances", type=int, default=2000)
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--profile", default=None,
+                        help="write a cProfile dump of the turn benchmarks here (slows the turns down)")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    utterances = make_utterances(args.utterances, seed=args.seed)
+    roles = [rng.choice(["buyer", "seller"]) for _ in utterances]
+    products = load_vocabulary()['product_keywords']
+
+    # Extraction doesn't depend on the catalog, so it runs once, uncached
+    extractor = AdvancedNERExtractor(config_path=CONFIG_PATH, model_name=args.model, cache_size=0)
+    extractor.extract(utterances[0]) # loads the model
+    extract_latencies = measure(extractor.extract, utterances)
+    requests = [(extractor.extract(text), role) for text, role in zip(utterances, roles)]
+    requests = [(request, role) for request, role in requests if request.get('product')]
+
+    print(f"model {args.model}, {len(utterances)} utterances "
+          f"({extractor.fast_path.stats()['hit_rate']:.0%} on the fast path, {len(requests)} with a product)")
+    print(f"{'benchmark':<12}{'size':>8}{'ops':>8}{'ops/s':>12}{'mean us':>12}{'p50 us':>12}{'p99 us':>12}")
+    print_row("extract", "-", extract_latencies)
+
+    profiler = PipelineProfiler(args.profile) if args.profile else None
+    breakdowns = []
+    for size in args.sizes.split(","):
+        listings = make_listings(listing_count(size), products=products)
+        start = time.perf_counter()
+        data_manager = DataManager(listings=listings)
+        print_row("load", size, [time.perf_counter() - start])
+        del listings
+
+        print_row("match", size, measure(lambda pair: find_best_matches(pair[0], data_manager, pair[1]), requests))
+
+        timings = StageTimings()
+        chatbot = Chatbot(config_path=CONFIG_PATH, warm_up=False, data_manager=data_manager, model_name=args.model,
+                          timings=timings, profiler=profiler)
+
+        def turn(pair):
+            session = ChatSession()
+            session.user_role = pair[1]
+            chatbot.respond(session, pair[0])
+
+        print_row("turn", size, measure(turn, zip(utterances, roles)))
+        breakdowns.append((size, timings, chatbot.cache_stats()))
+
+    if profiler is not None:
+        profiler.dump()
+
+    for size, timings, cache_stats in breakdowns:
+        print(f"\nturn breakdown at {size} listings "
+              f"(NER cache hit rate {cache_stats['ner']['hit_rate']:.0%}, "
+              f"match cache hit rate {cache_stats['matches']['hit_rate']:.0%}):")
+        print(timings.report())
+
+
+if __name__ == "__main__":
+    main()
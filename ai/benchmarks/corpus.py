@@ -0,0 +1,91 @@
+"""
+Reproducible synthetic data for the benchmarks: listings, and request utterances built
+from the config/ner_patterns.json vocabulary.
+
+Writing a listing feed for load_listing_feed / --listings (from the ai/ directory):
+    python -m benchmarks.corpus --listings 1m --out listings.jsonl
+"""
+import argparse
+import json
+import os
+import random
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), '..', 'config', 'ner_patterns.json')
+
+# Catalog sizes the benchmark suite runs at
+LISTING_SIZES = {'1k': 1_000, '100k': 100_000, '1m': 1_000_000}
+
+PRODUCTS = ["rice", "wheat", "sugar", "apples", "milk", "tea", "coffee", "chicken"]
+
+TEMPLATES = [
+    "{qty} {unit} {product} for {price} {currency} per {unit}",
+    "{qty} {unit} {product} at {price} {currency} per {unit}",
+    "I want to buy {qty} {unit} of {product} for {price} {currency}",
+    "I want to sell {qty} {unit} of {product} at {price} {currency} each",
+    "need {product}, about {qty} {unit}, budget {price} {currency}",
+    "{product} {qty} {unit}",
+    "do you have any {product}?",
+    "looking for {qty} {unit} {product} under {currency} {price}",
+]
+
+
+def load_vocabulary(config_path=CONFIG_PATH):
+    with open(config_path, 'r') as f:
+        return json.load(f)['patterns']
+
+
+def make_utterances(n, seed=0, config_path=CONFIG_PATH):
+    """Returns n reproducible request utterances."""
+    rng = random.Random(seed)
+    vocab = load_vocabulary(config_path)
+    utterances = []
+    for _ in range(n):
+        template = rng.choice(TEMPLATES)
+        utterances.append(template.format(
+            qty=rng.choice([1, 2, 5, 10, 20, 50, 100, 250, 500]),
+            unit=rng.choice(vocab['quantity_units']),
+            product=rng.choice(vocab['product_keywords']),
+            price=rng.choice([5, 10, 12.5, 30, 45, 50, 100]),
+            currency=rng.choice(vocab['price_currencies']),
+        ))
+    return utterances
+
+
+def make_listings(n, hot_product="apples", hot_share=0.3, seed=42, products=PRODUCTS):
+    """Generates n synthetic listings; hot_share of them are for hot_product, the rest spread over products."""
+    rng = random.Random(seed)
+    listings = []
+    for i in range(n):
+        product = hot_product if rng.random() < hot_share else rng.choice(products)
+        listings.append({
+            "listing_id": i + 1,
+            "user_id": f"user_{i}",
+            "type": rng.choice(["selling", "buying"]),
+            "product_name": product,
+            "quantity": float(rng.choice([50, 90, 100, 100, 110, 150, 200])),
+            "unit": "kg",
+            "price_per_unit": float(rng.randint(5, 20)),
+            "currency": "rupees",
+        })
+    return listings
+
+
+def listing_count(size):
+    """Parses a catalog size: a LISTING_SIZES name ('100k') or a plain number."""
+    return LISTING_SIZES[size.lower()] if size.lower() in LISTING_SIZES else int(size)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Writes a synthetic JSONL listing feed")
+    parser.add_argument("--listings", default="100k", help=f"one of {', '.join(LISTING_SIZES)} or a number")
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    with open(args.out, 'w') as feed:
+        for listing in make_listings(listing_count(args.listings), seed=args.seed):
+            feed.write(json.dumps(listing) + "\n")
+
+
+if __name__ == "__main__":
+    main()
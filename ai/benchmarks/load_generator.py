@@ -0,0 +1,80 @@
+"""
+Load generator for the asyncio chat server (src/server/chat_server.py).
+
+Each simulated session connects, picks a role, sends one request utterance and
+exits. Reports per-turn latency percentiles and completed sessions per second.
+
+Usage (from the ai/ directory, with the server running):
+    python -m benchmarks.load_generator [--sessions 2000] [--concurrency 500] [--port 8765]
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from benchmarks.corpus import make_utterances
+
+
+async def run_session(host, port, utterance, role, latencies):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        await reader.readline() # welcome
+        for message in (role, utterance, "exit"):
+            start = time.perf_counter()
+            writer.write((message + "\n").encode('utf-8'))
+            await writer.drain()
+            if not await reader.readline():
+                raise ConnectionError("server closed the connection")
+            latencies.append(time.perf_counter() - start)
+    finally:
+        writer.close()
+
+
+async def run_load(host, port, sessions, concurrency, seed=0):
+    rng = random.Random(seed)
+    utterances = make_utterances(sessions, seed=seed)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, errors = [], []
+
+    async def limited(utterance):
+        async with semaphore:
+            try:
+                await run_session(host, port, utterance, rng.choice(["buyer", "seller"]), latencies)
+            except (OSError, ConnectionError) as e:
+                errors.append(e)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(limited(u) for u in utterances))
+    elapsed = time.perf_counter() - start
+    return latencies, errors, elapsed
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return float('nan')
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--sessions", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=500)
+    args = parser.parse_args()
+
+    latencies, errors, elapsed = asyncio.run(run_load(args.host, args.port, args.sessions, args.concurrency))
+    latencies.sort()
+    completed = args.sessions - len(errors)
+    print(f"{completed}/{args.sessions} sessions in {elapsed:.2f}s "
+          f"({completed / elapsed:.0f} sessions/s, concurrency {args.concurrency})")
+    print(f"turn latency: p50 {percentile(latencies, 0.50) * 1e3:.2f} ms, "
+          f"p99 {percentile(latencies, 0.99) * 1e3:.2f} ms, mean {statistics.fmean(latencies) * 1e3:.2f} ms"
+          if latencies else "no turns completed")
+    if errors:
+        print(f"{len(errors)} sessions failed, e.g. {errors[0]!r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import numpy as np
+
+from src.database.conversion import default_conversions, normalized_listing
+from src.database.data_manager import normalize_product
+
+# Code used for a missing (empty/None) categorical value
+MISSING = -1
+# Code returned for a value that never appears in the store
+UNKNOWN = -2
+
+
+class ColumnarListingStore:
+    """
+    Read-only columnar snapshot of listings for vectorized scoring.
+
+    Normalized quantities and prices (see conversion.Normalized) are held in
+    float64 arrays and the categorical fields (type, product, unit dimension,
+    normalized currency) are dictionary-encoded into int32 arrays.
+    Rows are also grouped by (type, product) so a query only touches its own
+    candidate set. The snapshot does not follow later changes to the source
+    listings; build a new store after bulk updates.
+    """
+
+    def __init__(self, listings, conversions=None):
+        self.listings = list(listings)
+        self.conversions = conversions or default_conversions()
+        n = len(self.listings)
+
+        self.quantity = np.zeros(n, dtype=np.float64)
+        self.unit_price = np.zeros(n, dtype=np.float64)
+        self.base_price = np.zeros(n, dtype=np.float64)
+        self.type = np.empty(n, dtype=np.int32)
+        self.product = np.empty(n, dtype=np.int32)
+        self.dimension = np.empty(n, dtype=np.int32)
+        self.currency = np.empty(n, dtype=np.int32)
+
+        self._vocab = {'type': {}, 'product': {}, 'dimension': {}, 'currency': {}}
+        groups = {}
+        for row, listing in enumerate(self.listings):
+            normalized = normalized_listing(listing, self.conversions)
+            # Missing numbers become 0.0, which scores exactly like the falsy value in score_listing
+            self.quantity[row] = normalized.quantity or 0.0
+            self.unit_price[row] = normalized.unit_price or 0.0
+            self.base_price[row] = normalized.base_price or 0.0
+            self.type[row] = self._intern('type', listing.get('type'))
+            self.product[row] = self._intern('product', listing.get('product_name'))
+            self.dimension[row] = self._intern('dimension', normalized.dimension)
+            self.currency[row] = self._intern('currency', normalized.currency)
+            groups.setdefault((self.type[row], self.product[row]), []).append(row)
+
+        self._groups = {key: np.array(rows, dtype=np.intp) for key, rows in groups.items()}
+
+    def __len__(self):
+        return len(self.listings)
+
+    def encode(self, column, value):
+        """Returns the code of a value in one categorical column (MISSING if empty, UNKNOWN if never seen)."""
+        key = _vocab_key(column, value)
+        if not key:
+            return MISSING
+        return self._vocab[column].get(key, UNKNOWN)
+
+    def candidate_rows(self, listing_type, product_name):
+        """Returns the row indices (ascending) of listings with the given type and product."""
+        key = (self.encode('type', listing_type), self.encode('product', product_name))
+        return self._groups.get(key, np.empty(0, dtype=np.intp))
+
+    def _intern(self, column, value):
+        key = _vocab_key(column, value)
+        if not key:
+            return MISSING
+        vocab = self._vocab[column]
+        return vocab.setdefault(key, len(vocab))
+
+
+def _vocab_key(column, value):
+    # Products match like the indexes do (see normalize_product), the other columns exactly
+    return normalize_product(value) if column == 'product' else value
@@ -0,0 +1,111 @@
+import json
+import os
+from collections import namedtuple
+
+from src.nlp.normalization import EntityNormalizer
+
+DEFAULT_CONVERSIONS_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'config', 'conversions.json')
+# Unit/currency aliases ("kgs", "grams", "rs", ...) are shared with the NER config
+DEFAULT_PATTERNS_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'config', 'ner_patterns.json')
+
+# Relative tolerance for tier comparisons, so converting both sides (e.g. 950 gram vs 1 kg)
+# doesn't move a listing across a tier boundary through float rounding alone
+TOLERANCE = 1e-9
+
+# A quantity/price expressed in canonical terms:
+#   quantity   - quantity in the dimension's base unit (kg, liter, units)
+#   dimension  - 'mass', 'volume', 'count', the unit itself for unconvertible units, or None
+#   unit_price - price per the original unit, in the base currency when the rate is known
+#   base_price - price per base unit, in the base currency when the rate is known
+#   currency   - the base currency, the original currency if no rate is known, or None
+Normalized = namedtuple('Normalized', ['quantity', 'dimension', 'unit_price', 'base_price', 'currency'])
+
+
+class ConversionTable:
+    """
+    Dimension-aware unit factors and currency exchange rates.
+
+    Units map to (dimension, factor to the dimension's base unit); rates map a
+    currency to its value in base_currency. Before the lookup, units and currencies
+    are mapped to their canonical spelling with the normalizer's alias tables, so a
+    listing in "grams" and "rs" converts like one in "gram" and "rupees". Units and
+    currencies still unknown after that are left as they are and only compare
+    equal to themselves.
+    """
+
+    def __init__(self, units=None, exchange_rates=None, base_currency=None, normalizer=None):
+        self.units = {unit.lower(): (spec['dimension'], float(spec['factor'])) for unit, spec in (units or {}).items()}
+        self.exchange_rates = {currency.lower(): float(rate) for currency, rate in (exchange_rates or {}).items()}
+        self.base_currency = base_currency
+        self.normalizer = normalizer or EntityNormalizer({})
+
+    @classmethod
+    def from_config(cls, config_path=DEFAULT_CONVERSIONS_PATH, patterns_path=DEFAULT_PATTERNS_PATH):
+        normalizer = EntityNormalizer(cls._load_patterns(patterns_path))
+        try:
+            with open(config_path, 'r') as f:
+                config = json.load(f)
+        except FileNotFoundError:
+            print(f"Error: Conversion config not found at {config_path}. Only identical units/currencies will match.")
+            return cls(normalizer=normalizer)
+        return cls(config.get('units'), config.get('exchange_rates'), config.get('base_currency'), normalizer)
+
+    @staticmethod
+    def _load_patterns(patterns_path):
+        try:
+            with open(patterns_path, 'r') as f:
+                return json.load(f)['patterns']
+        except FileNotFoundError:
+            print(f"Error: Config file not found at {patterns_path}. Unit/currency aliases won't be converted.")
+            return {}
+
+    def normalize(self, quantity, unit, price, currency):
+        """Returns the Normalized form of a quantity/unit and price/currency."""
+        dimension, factor = self.unit_factor(unit)
+
+        rate = 1.0
+        if currency:
+            currency = self.normalizer.currency(currency)
+            if currency in self.exchange_rates:
+                currency, rate = self.base_currency, self.exchange_rates[currency]
+        else:
+            currency = None
+
+        base_quantity = quantity * factor if quantity else quantity
+        unit_price = price * rate if price else price
+        base_price = unit_price / factor if price else price
+        return Normalized(base_quantity, dimension, unit_price, base_price, currency)
+
+    def unit_factor(self, unit):
+        """Returns (dimension, factor to the dimension's base unit) for a unit, alias or None."""
+        if not unit:
+            return None, 1.0
+        unit = self.normalizer.unit(unit)
+        return self.units.get(unit, (unit, 1.0))
+
+    def normalize_listing(self, listing):
+        return self.normalize(listing.get('quantity'), listing.get('unit'),
+                              listing.get('price_per_unit'), listing.get('currency'))
+
+    def normalize_request(self, user_request):
+        return self.normalize(user_request.get('quantity'), user_request.get('unit'),
+                              user_request.get('price'), user_request.get('currency'))
+
+
+_default_conversions = None
+
+
+def default_conversions():
+    """The ConversionTable from config/conversions.json, loaded once."""
+    global _default_conversions
+    if _default_conversions is None:
+        _default_conversions = ConversionTable.from_config()
+    return _default_conversions
+
+
+def normalized_listing(listing, conversions=None):
+    """A listing's Normalized form: the one stored at ingestion if present, else computed now."""
+    normalized = listing.get('normalized')
+    if normalized is None:
+        normalized = (conversions or default_conversions()).normalize_listing(listing)
+    return normalized
@@ -1,16 +1,208 @@
+from bisect import bisect_left, bisect_right, insort
+
+from src.database.conversion import default_conversions
 from src.database.dummy_data import database_listings
+from src.database.listing import LISTING_FIELDS, Listing
+
+
+def normalize_product(product_name):
+    """Normalizes a product name for index lookups (case/whitespace-insensitive)."""
+    return (product_name or '').strip().lower()
+
+
+def price_key(listing):
+    """
+    Sort key for a listing's price: per base unit, in the base currency (see conversion.Normalized).
+
+    Listings without a price sort before everything else so they never fall inside a price band.
+    """
+    price = listing['normalized'].base_price
+    return float(price) if price else float('-inf')
+
 
 class DataManager:
-    def __init__(self):
-        self.listings = database_listings
+    """
+    In-memory order book of product listings.
+
+    Besides the primary store keyed by listing_id, listings are indexed into
+    per-(type, normalized product) buckets kept sorted by price, so a lookup for
+    one product (optionally within a price band) costs a dict hit plus a binary
+    search instead of a scan over the whole marketplace.
+
+    Every listing is normalized to base units and currency when it enters (stored
+    under 'normalized'), and buckets are ordered by that normalized price.
+
+    Listings may be plain dicts or compact Listing records (see listing.py and
+    listing_loader.py for streaming large feeds in); both are stored as given.
+
+    Each bucket also has a version that changes whenever a listing enters or leaves
+    it, so caches of per-product results (see matching.match_cache) can tell which
+    entries went stale.
+    """
+
+    def __init__(self, listings=None, conversions=None):
+        self.conversions = conversions or default_conversions()
+        self._by_id = {}
+        # (type, normalized product) -> sorted list of (price, listing_id)
+        self._index = {}
+        # (type, normalized product) -> number of changes to that bucket so far
+        self._versions = {}
+        # (type, normalized product) -> {(dimension, unit factor): [min, max] normalized quantity}
+        self._profiles = {}
+        self._next_id = 1
+
+        self.import_listings(database_listings if listings is None else listings)
 
     def get_all_listings(self):
         """Returns all listings from the database."""
-        return self.listings
-
-    # In a real application, you'd add methods for:
-    # def add_listing(self, listing_data): ...
-    # def get_listing_by_id(self, listing_id): ...
-    # def update_listing(self, listing_id, new_data): ...
-    # def delete_listing(self, listing_id): ...
-    # And it would interact with a real DB (SQLAlchemy, psycopg2, etc.)
\ No newline at end of file
+        return list(self._by_id.values())
+
+    def import_listings(self, listings):
+        """
+        Adds many listings at once (copies of the given dicts or Listing records).
+
+        Returns:
+            int: The number of listings added.
+        """
+        count = 0
+        for listing in listings:
+            self.add_listing(listing.copy())
+            count += 1
+        return count
+
+    def export_listings(self):
+        """Returns copies of all listings without derived fields, ready for import_listings."""
+        return [{k: v for k, v in listing.items() if k != 'normalized'} for listing in self._by_id.values()]
+
+    def get_listing_by_id(self, listing_id):
+        """Returns the listing with the given id, or None if it doesn't exist."""
+        return self._by_id.get(listing_id)
+
+    def add_listing(self, listing_data):
+        """
+        Adds a listing, normalizes and indexes it. A listing_id is assigned if missing.
+
+        Returns:
+            dict: The stored listing.
+        """
+        listing = listing_data
+        if listing.get('listing_id') is None:
+            listing['listing_id'] = self._next_id
+        listing_id = listing['listing_id']
+
+        if listing_id in self._by_id:
+            self._unindex(self._by_id[listing_id])
+        self._by_id[listing_id] = listing
+        self._index_listing(listing)
+
+        if isinstance(listing_id, int) and listing_id >= self._next_id:
+            self._next_id = listing_id + 1
+        return listing
+
+    def update_listing(self, listing_id, new_data):
+        """
+        Updates fields of an existing listing, then re-normalizes and re-indexes it.
+
+        Returns:
+            dict or None: The updated listing, or None if it doesn't exist.
+        """
+        listing = self._by_id.get(listing_id)
+        if listing is None:
+            return None
+
+        updates = {k: v for k, v in new_data.items() if k not in ('listing_id', 'normalized')}
+        if isinstance(listing, Listing):
+            # Records only have the listing fields; other keys are ignored, as in Listing.from_dict
+            updates = {k: v for k, v in updates.items() if k in LISTING_FIELDS}
+
+        self._unindex(listing)
+        try:
+            listing.update(updates)
+        finally:
+            self._index_listing(listing) # Never leave a stored listing out of its bucket
+        return listing
+
+    def delete_listing(self, listing_id):
+        """
+        Removes a listing from the store and the index.
+
+        Returns:
+            dict or None: The removed listing, or None if it doesn't exist.
+        """
+        listing = self._by_id.pop(listing_id, None)
+        if listing is not None:
+            self._unindex(listing)
+        return listing
+
+    def get_candidates(self, listing_type, product_name, min_price=None, max_price=None):
+        """
+        Returns listings of one type and product, in ascending price order.
+
+        Args:
+            listing_type (str): 'selling' or 'buying'.
+            product_name (str): Product to look up (case-insensitive).
+            min_price (float, optional): Inclusive lower bound on the normalized price.
+            max_price (float, optional): Inclusive upper bound on the normalized price.
+
+        Returns:
+            list: Matching listings sorted by normalized price.
+        """
+        return list(self.iter_candidates(listing_type, product_name, min_price, max_price))
+
+    def iter_candidates(self, listing_type, product_name, min_price=None, max_price=None, descending=False):
+        """Lazily yields the same listings as get_candidates, optionally from the highest price down."""
+        bucket = self._index.get((listing_type, normalize_product(product_name)))
+        if not bucket:
+            return
+
+        lo = 0 if min_price is None else bisect_left(bucket, (float(min_price),))
+        # (max_price, inf) sorts after every entry priced exactly max_price
+        hi = len(bucket) if max_price is None else bisect_right(bucket, (float(max_price), float('inf')))
+        positions = range(hi - 1, lo - 1, -1) if descending else range(lo, hi)
+        for pos in positions:
+            yield self._by_id[bucket[pos][1]]
+
+    def bucket_version(self, listing_type, product_name):
+        """Returns a value that changes whenever a listing of this type and product is added, updated or removed."""
+        return self._versions.get((listing_type, normalize_product(product_name)), 0)
+
+    def bucket_profile(self, listing_type, product_name):
+        """
+        Returns the units present among listings of this type and product.
+
+        Maps (dimension, factor to the base unit) to the [min, max] normalized quantity
+        seen for that unit ([inf, -inf] if none had a quantity). find_best_matches uses
+        it to bound the scores still reachable while walking a bucket. The ranges only
+        widen until the bucket empties, so after deletions they're loose but still bounds.
+        """
+        return self._profiles.get((listing_type, normalize_product(product_name)), {})
+
+    def _bucket_key(self, listing):
+        return (listing.get('type'), normalize_product(listing.get('product_name')))
+
+    def _index_listing(self, listing):
+        listing['normalized'] = self.conversions.normalize_listing(listing)
+        key = self._bucket_key(listing)
+        insort(self._index.setdefault(key, []), (price_key(listing), listing['listing_id']))
+        self._versions[key] = self._versions.get(key, 0) + 1
+
+        profile = self._profiles.setdefault(key, {})
+        quantities = profile.setdefault(self.conversions.unit_factor(listing.get('unit')), [float('inf'), float('-inf')])
+        quantity = listing['normalized'].quantity
+        if quantity:
+            quantities[0] = min(quantities[0], quantity)
+            quantities[1] = max(quantities[1], quantity)
+
+    def _unindex(self, listing):
+        key = self._bucket_key(listing)
+        bucket = self._index.get(key)
+        if not bucket:
+            return
+        entry = (price_key(listing), listing['listing_id'])
+        pos = bisect_left(bucket, entry)
+        if pos < len(bucket) and bucket[pos] == entry:
+            del bucket[pos]
+            self._versions[key] += 1
+        if not bucket:
+            del self._index[key]
+            self._profiles.pop(key, None)
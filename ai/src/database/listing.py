@@ -0,0 +1,89 @@
+import sys
+
+LISTING_FIELDS = ('listing_id', 'user_id', 'type', 'product_name', 'quantity', 'unit', 'price_per_unit', 'currency')
+
+# Fields with few distinct values, stored as one shared string object each
+INTERNED_FIELDS = ('type', 'product_name', 'unit', 'currency')
+
+
+class Listing:
+    """
+    Compact listing record: the fields of a listing dict in __slots__.
+
+    A slotted record has no per-instance __dict__ and no per-listing copy of the
+    key strings, and the type/product/unit/currency strings are interned so a
+    million listings share a handful of string objects. Records support the part
+    of the dict interface the rest of the code uses (listing['price_per_unit'],
+    get, items, update, copy), so DataManager, the matchers and the chatbot take
+    them wherever they take listing dicts.
+    """
+
+    __slots__ = LISTING_FIELDS + ('normalized',)
+
+    def __init__(self, listing_id=None, user_id=None, type=None, product_name=None, quantity=None, unit=None,
+                 price_per_unit=None, currency=None, normalized=None):
+        self.listing_id = listing_id
+        self.user_id = user_id
+        self.type = _intern(type)
+        self.product_name = _intern(product_name)
+        self.quantity = quantity
+        self.unit = _intern(unit)
+        self.price_per_unit = price_per_unit
+        self.currency = _intern(currency)
+        self.normalized = normalized
+
+    @classmethod
+    def from_dict(cls, data):
+        """Builds a record from a listing dict; keys that aren't listing fields are ignored."""
+        return cls(*(data.get(field) for field in LISTING_FIELDS), normalized=data.get('normalized'))
+
+    def to_dict(self):
+        """Returns the listing as a plain dict (without 'normalized')."""
+        return {field: getattr(self, field) for field in LISTING_FIELDS}
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except (AttributeError, TypeError):
+            raise KeyError(key) from None
+
+    def __setitem__(self, key, value):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        setattr(self, key, _intern(value) if key in INTERNED_FIELDS else value)
+
+    def __contains__(self, key):
+        return key in self.__slots__
+
+    def get(self, key, default=None):
+        return getattr(self, key, default) if key in self.__slots__ else default
+
+    def keys(self):
+        return self.__slots__
+
+    def items(self):
+        return [(key, getattr(self, key)) for key in self.__slots__]
+
+    def update(self, data):
+        for key, value in data.items():
+            self[key] = value
+
+    def copy(self):
+        return Listing(*(getattr(self, field) for field in LISTING_FIELDS), normalized=self.normalized)
+
+    def __eq__(self, other):
+        # Compared like exported listings: 'normalized' is derived, so it doesn't count
+        if isinstance(other, Listing):
+            return self.to_dict() == other.to_dict()
+        if isinstance(other, dict):
+            return self.to_dict() == {k: v for k, v in other.items() if k != 'normalized'}
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Listing({', '.join(f'{field}={getattr(self, field)!r}' for field in LISTING_FIELDS)})"
+
+
+def _intern(value):
+    return sys.intern(value) if type(value) is str else value
@@ -0,0 +1,117 @@
+import csv
+import json
+import os
+from itertools import islice
+
+from src.database.listing import Listing
+
+# Feed formats by file extension
+FORMATS = {'.jsonl': 'jsonl', '.ndjson': 'jsonl', '.csv': 'csv'}
+
+
+def read_listing_feed(path, format=None):
+    """
+    Yields Listing records from a listing feed, reading it one line at a time.
+
+    Args:
+        path (str): A JSONL file (one listing object per line) or a CSV file with a
+            header row naming the listing fields.
+        format (str, optional): 'jsonl' or 'csv'; guessed from the extension if omitted.
+
+    Returns:
+        generator: Listing records, in file order.
+    """
+    format = format or feed_format(path)
+    with open(path, 'rb') as feed:
+        yield from _records(feed, format, path)
+
+
+def load_listing_feed(path, data_manager, format=None, chunk_size=10000, progress=None):
+    """
+    Streams a listing feed into a DataManager (or SQLiteDataManager).
+
+    Only one chunk of parsed rows is held at a time on top of what the data manager
+    keeps, so memory stays bounded by the store rather than by the file.
+
+    Args:
+        path (str): The feed, see read_listing_feed.
+        data_manager: Anything with import_listings.
+        format (str, optional): 'jsonl' or 'csv'; guessed from the extension if omitted.
+        chunk_size (int): Listings passed to import_listings at once.
+        progress (callable, optional): Called after every chunk with
+            (listings loaded, bytes read, total bytes), e.g. print_progress.
+
+    Returns:
+        int: The number of listings loaded.
+    """
+    format = format or feed_format(path)
+    total_bytes = os.path.getsize(path)
+    count = reported = 0
+    with open(path, 'rb') as feed:
+        records = _records(feed, format, path)
+        while True:
+            chunk = list(islice(records, chunk_size))
+            if not chunk:
+                break
+            data_manager.import_listings(chunk)
+            count += len(chunk)
+            if progress:
+                reported = feed.tell()
+                progress(count, reported, total_bytes)
+        # The last chunk may end before trailing blank lines; always finish at 100%
+        if progress and reported != feed.tell():
+            progress(count, feed.tell(), total_bytes)
+    return count
+
+
+def print_progress(count, bytes_read, total_bytes):
+    """Progress callback for load_listing_feed that keeps one status line up to date."""
+    done = bytes_read >= total_bytes
+    share = bytes_read / total_bytes if total_bytes else 1.0
+    print(f"\rLoaded {count:,} listings ({share:.0%})", end="\n" if done else "", flush=True)
+
+
+def feed_format(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in FORMATS:
+        raise ValueError(f"Unknown listing feed format for {path} (expected one of {', '.join(FORMATS)})")
+    return FORMATS[extension]
+
+
+def _records(feed, format, name):
+    if format == 'jsonl':
+        for line_number, line in enumerate(feed, 1):
+            if not line.strip():
+                continue
+            try:
+                data = json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"{name}, line {line_number}: {e}") from None
+            yield _record(data)
+    elif format == 'csv':
+        for row in csv.DictReader(line.decode('utf-8') for line in feed):
+            yield _record(row)
+    else:
+        raise ValueError(f"Unknown listing feed format: {format}")
+
+
+def _record(data):
+    # CSV gives strings for everything and '' for missing values; JSON may give ints
+    return Listing(
+        listing_id=_integer(data.get('listing_id')),
+        user_id=data.get('user_id') or None,
+        type=data.get('type') or None,
+        product_name=data.get('product_name') or None,
+        quantity=_number(data.get('quantity')),
+        unit=data.get('unit') or None,
+        price_per_unit=_number(data.get('price_per_unit')),
+        currency=data.get('currency') or None,
+    )
+
+
+def _integer(value):
+    return int(value) if value not in (None, '') else None
+
+
+def _number(value):
+    return float(value) if value not in (None, '') else None
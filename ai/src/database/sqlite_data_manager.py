@@ -0,0 +1,220 @@
+import sqlite3
+
+from src.database.conversion import Normalized, default_conversions
+from src.database.data_manager import normalize_product
+from src.database.dummy_data import database_listings
+from src.database.listing import LISTING_FIELDS
+
+NORMALIZED_FIELDS = ('base_quantity', 'dimension', 'unit_price', 'base_price', 'base_currency')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS listings (
+    listing_id INTEGER PRIMARY KEY,
+    user_id TEXT,
+    type TEXT,
+    product_name TEXT,
+    quantity REAL,
+    unit TEXT,
+    price_per_unit REAL,
+    currency TEXT,
+    product_key TEXT NOT NULL,
+    base_quantity REAL,
+    dimension TEXT,
+    unit_price REAL,
+    base_price REAL,
+    base_currency TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_listings_book ON listings (type, product_key, base_price, listing_id);
+"""
+
+_COLUMNS = LISTING_FIELDS + ('product_key',) + NORMALIZED_FIELDS
+_INSERT = (f"INSERT OR REPLACE INTO listings ({', '.join(_COLUMNS)}) "
+           f"VALUES ({', '.join('?' for _ in _COLUMNS)})")
+_SELECT = f"SELECT {', '.join(LISTING_FIELDS + NORMALIZED_FIELDS)} FROM listings"
+
+
+class SQLiteDataManager:
+    """
+    SQLite-backed order book with the same interface as DataManager.
+
+    Listings persist in a single database file (stdlib sqlite3, no server). Each
+    row stores its normalized form next to the original fields, and the
+    (type, product, normalized price) index lets candidate lookups, including
+    price bands and the price ordering find_best_matches walks, run in SQL.
+    File databases use WAL journaling so other connections can read while
+    one writes; open one SQLiteDataManager per thread or process.
+
+    Bucket versions (see DataManager.bucket_version) are tracked in memory, so they
+    only see changes made through this instance.
+    """
+
+    def __init__(self, path=':memory:', listings=None, conversions=None, fetch_size=256, seed=None):
+        """
+        Args:
+            path (str): Database file, or ':memory:' for a throwaway database.
+            listings (list, optional): Listings to import.
+            seed (bool, optional): Whether to fill an empty database with the dummy listings
+                when no listings are given. Defaults to True for ':memory:' only, so a
+                database file never picks up demo data.
+            conversions (ConversionTable, optional): Table used to normalize listings.
+            fetch_size (int): Rows fetched per round trip while iterating candidates.
+        """
+        self.path = path
+        self.conversions = conversions or default_conversions()
+        self.fetch_size = fetch_size
+        # Bulk imports don't report which buckets they touched, so they bump every version
+        self._generation = 0
+        self._versions = {}
+
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+
+        if seed is None:
+            seed = path == ':memory:'
+        if listings is not None:
+            self.import_listings(listings)
+        elif seed and self._count() == 0:
+            self.import_listings(database_listings)
+
+    def close(self):
+        self.connection.close()
+
+    def get_all_listings(self):
+        """Returns all listings from the database."""
+        return [self._to_listing(row) for row in self.connection.execute(f"{_SELECT} ORDER BY rowid")]
+
+    def get_listing_by_id(self, listing_id):
+        """Returns the listing with the given id, or None if it doesn't exist."""
+        row = self.connection.execute(f"{_SELECT} WHERE listing_id = ?", (listing_id,)).fetchone()
+        return self._to_listing(row) if row else None
+
+    def add_listing(self, listing_data):
+        """
+        Adds (or replaces) a listing. A listing_id is assigned if missing.
+
+        Returns:
+            dict: The stored listing.
+        """
+        if listing_data.get('listing_id') is not None:
+            self._touch(self.get_listing_by_id(listing_data['listing_id']))
+        with self.connection:
+            cursor = self.connection.execute(_INSERT, self._to_row(listing_data))
+        self._touch(listing_data)
+        return self.get_listing_by_id(cursor.lastrowid if listing_data.get('listing_id') is None
+                                      else listing_data['listing_id'])
+
+    def import_listings(self, listings):
+        """
+        Adds many listings in one transaction with executemany.
+
+        Returns:
+            int: The number of listings added.
+        """
+        with self.connection:
+            cursor = self.connection.executemany(_INSERT, (self._to_row(listing) for listing in listings))
+        self._generation += 1
+        return cursor.rowcount
+
+    def export_listings(self):
+        """Returns all listings without derived fields, ready for import_listings."""
+        return [{k: v for k, v in listing.items() if k != 'normalized'} for listing in self.get_all_listings()]
+
+    def update_listing(self, listing_id, new_data):
+        """
+        Updates fields of an existing listing and re-normalizes it.
+
+        Returns:
+            dict or None: The updated listing, or None if it doesn't exist.
+        """
+        listing = self.get_listing_by_id(listing_id)
+        if listing is None:
+            return None
+
+        self._touch(listing)
+        listing.update({k: v for k, v in new_data.items() if k not in ('listing_id', 'normalized')})
+        with self.connection:
+            self.connection.execute(_INSERT, self._to_row(listing))
+        self._touch(listing)
+        return self.get_listing_by_id(listing_id)
+
+    def delete_listing(self, listing_id):
+        """
+        Removes a listing.
+
+        Returns:
+            dict or None: The removed listing, or None if it doesn't exist.
+        """
+        listing = self.get_listing_by_id(listing_id)
+        if listing is not None:
+            with self.connection:
+                self.connection.execute("DELETE FROM listings WHERE listing_id = ?", (listing_id,))
+            self._touch(listing)
+        return listing
+
+    def get_candidates(self, listing_type, product_name, min_price=None, max_price=None):
+        """
+        Returns listings of one type and product, in ascending normalized price order.
+
+        Args:
+            listing_type (str): 'selling' or 'buying'.
+            product_name (str): Product to look up (case-insensitive).
+            min_price (float, optional): Inclusive lower bound on the normalized price.
+            max_price (float, optional): Inclusive upper bound on the normalized price.
+
+        Returns:
+            list: Matching listings sorted by normalized price.
+        """
+        return list(self.iter_candidates(listing_type, product_name, min_price, max_price))
+
+    def iter_candidates(self, listing_type, product_name, min_price=None, max_price=None, descending=False):
+        """Lazily yields the same listings as get_candidates, optionally from the highest price down."""
+        query = f"{_SELECT} WHERE type = ? AND product_key = ?"
+        params = [listing_type, normalize_product(product_name)]
+        # Listings without a price sort first (NULL), as in the in-memory index
+        if min_price is not None:
+            query += " AND base_price >= ?"
+            params.append(float(min_price))
+        if max_price is not None:
+            query += " AND (base_price IS NULL OR base_price <= ?)"
+            params.append(float(max_price))
+        order = "DESC" if descending else "ASC"
+        query += f" ORDER BY base_price {order}, listing_id {order}"
+
+        cursor = self.connection.execute(query, params)
+        try:
+            while True:
+                rows = cursor.fetchmany(self.fetch_size)
+                if not rows:
+                    return
+                for row in rows:
+                    yield self._to_listing(row)
+        finally:
+            cursor.close()
+
+    def bucket_version(self, listing_type, product_name):
+        """Returns a value that changes whenever a listing of this type and product is added, updated or removed."""
+        return self._generation, self._versions.get((listing_type, normalize_product(product_name)), 0)
+
+    def _touch(self, listing):
+        if listing is not None:
+            key = (listing.get('type'), normalize_product(listing.get('product_name')))
+            self._versions[key] = self._versions.get(key, 0) + 1
+
+    def _count(self):
+        return self.connection.execute("SELECT COUNT(*) FROM listings").fetchone()[0]
+
+    def _to_row(self, listing):
+        normalized = self.conversions.normalize_listing(listing)
+        return (tuple(listing.get(field) for field in LISTING_FIELDS)
+                + (normalize_product(listing.get('product_name')),)
+                # Missing/zero prices are stored as NULL so they sort like the in-memory -inf key
+                + (normalized.quantity, normalized.dimension, normalized.unit_price or None,
+                   normalized.base_price or None, normalized.currency))
+
+    @staticmethod
+    def _to_listing(row):
+        listing = dict(zip(LISTING_FIELDS, row[:len(LISTING_FIELDS)]))
+        listing['normalized'] = Normalized(*row[len(LISTING_FIELDS):])
+        return listing
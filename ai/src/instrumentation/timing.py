@@ -0,0 +1,178 @@
+import atexit
+import cProfile
+import os
+import time
+from bisect import bisect_left
+
+# Opt-in switches for a running chatbot (see timings_from_env and profiler_from_env)
+TIMINGS_ENV = "CHATBOT_TIMINGS"
+PROFILE_ENV = "CHATBOT_PROFILE"
+
+# Histogram bucket upper bounds in seconds: 1 us to ~2 min, four buckets per doubling
+BUCKET_BOUNDS = tuple(1e-6 * 2 ** (i / 4) for i in range(108))
+
+
+class Histogram:
+    """
+    Fixed-size latency histogram with log-spaced buckets.
+
+    Recording is a binary search and a counter increment, and memory doesn't grow
+    with the number of samples. Percentiles are read from the bucket bounds, so
+    they're accurate to about 19% (one bucket).
+    """
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        self.counts[bisect_left(BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, q):
+        """Returns the upper bound of the bucket holding the q-th fraction (0-1) of samples, in seconds."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return min(BUCKET_BOUNDS[i], self.max) if i < len(BUCKET_BOUNDS) else self.max
+        return self.max
+
+    def stats(self):
+        """Returns the sample count and the mean/p50/p90/p99/max latencies in milliseconds."""
+        return {
+            'count': self.count,
+            'mean_ms': self.total / self.count * 1e3 if self.count else 0.0,
+            'p50_ms': self.percentile(0.50) * 1e3,
+            'p90_ms': self.percentile(0.90) * 1e3,
+            'p99_ms': self.percentile(0.99) * 1e3,
+            'max_ms': self.max * 1e3,
+        }
+
+
+class StageTimings:
+    """
+    Per-stage latency histograms for the chatbot pipeline.
+
+    Usage:
+        with timings.stage('extract'):
+            ...
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self.histograms = {}
+
+    def stage(self, name):
+        return _StageTimer(self, name)
+
+    def record(self, name, seconds):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        histogram.record(seconds)
+
+    def stats(self):
+        return {name: histogram.stats() for name, histogram in self.histograms.items()}
+
+    def report(self):
+        """Returns the stats as a table, one line per stage."""
+        lines = [f"{'stage':<12}{'count':>10}{'mean ms':>10}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}"]
+        for name, stats in self.stats().items():
+            lines.append(f"{name:<12}{stats['count']:>10}{stats['mean_ms']:>10.3f}{stats['p50_ms']:>10.3f}"
+                         f"{stats['p90_ms']:>10.3f}{stats['p99_ms']:>10.3f}{stats['max_ms']:>10.3f}")
+        return "\n".join(lines)
+
+
+class _StageTimer:
+    __slots__ = ('timings', 'name', 'start')
+
+    def __init__(self, timings, name):
+        self.timings = timings
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.timings.record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class _NullStage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+class NullTimings:
+    """Stand-in for StageTimings when timing is off: every stage is a shared no-op context."""
+
+    enabled = False
+    _stage = _NullStage()
+
+    def stage(self, name):
+        return self._stage
+
+    def record(self, name, seconds):
+        pass
+
+    def stats(self):
+        return {}
+
+    def report(self):
+        return ""
+
+
+NO_TIMINGS = NullTimings()
+
+
+class PipelineProfiler:
+    """
+    cProfile around chatbot turns, dumped to a pstats file.
+
+    Only the code inside `with profiler:` blocks is profiled; view the dump with
+    `python -m pstats FILE` or snakeviz.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.profile = cProfile.Profile()
+
+    def __enter__(self):
+        self.profile.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profile.disable()
+        return False
+
+    def dump(self):
+        self.profile.dump_stats(self.path)
+
+
+def timings_from_env():
+    """Returns StageTimings if CHATBOT_TIMINGS is set to anything but ''/0, otherwise NO_TIMINGS."""
+    return StageTimings() if os.environ.get(TIMINGS_ENV, "") not in ("", "0") else NO_TIMINGS
+
+
+def profiler_from_env():
+    """Returns a PipelineProfiler dumping to $CHATBOT_PROFILE at exit, or None if it isn't set."""
+    path = os.environ.get(PROFILE_ENV)
+    if not path:
+        return None
+    profiler = PipelineProfiler(path)
+    atexit.register(profiler.dump)
+    return profiler
@@ -1,84 +1,205 @@
 import json # Not directly used here, but good practice if you load configs in main
-from src.nlp.ner_extractor import AdvancedNERExtractor
+from src.nlp.ner_extractor import DEFAULT_MODEL, AdvancedNERExtractor, get_model
 from src.database.data_manager import DataManager
-from src.matching.matcher import find_best_matches
+from src.instrumentation.timing import profiler_from_env, timings_from_env
+from src.matching.match_cache import MatchCache
+
+WELCOME_MESSAGE = "AI Model: Welcome! Are you a 'buyer' or a 'seller'?"
+ACKNOWLEDGEMENTS = ["alright", "okay", "yes", "sure", "go ahead"]
+
+
+class ChatSession:
+    """Per-conversation state, so one Chatbot can serve many users at once."""
+
+    def __init__(self, session_id=None):
+        self.session_id = session_id
+        self.user_role = None # The user's role in the current transaction ('buyer'/'seller')
+
 
 class Chatbot:
-    def __init__(self, config_path='config/ner_patterns.json'):
+    def __init__(self, config_path='config/ner_patterns.json', warm_up=True, data_manager=None,
+                 model_name=DEFAULT_MODEL, timings=None, profiler=None):
         # Initialize components, passing config path to NER
-        self.ner_extractor = AdvancedNERExtractor(config_path=config_path)
-        self.data_manager = DataManager()
-        self.current_user_role = None # State variable to track user's role in the conversation
+        self.ner_extractor = AdvancedNERExtractor(config_path=config_path, model_name=model_name)
+        # Any DataManager-compatible store (in-memory by default, or SQLiteDataManager)
+        self.data_manager = data_manager if data_manager is not None else DataManager()
+        # Recent match results, recomputed only when their product's listings change
+        self.match_cache = MatchCache(self.data_manager)
+        # Session used by process_user_input (the single-user REPL)
+        self.session = ChatSession()
+
+        # Opt-in instrumentation: per-stage latency histograms (CHATBOT_TIMINGS=1) and
+        # a cProfile dump of every turn (CHATBOT_PROFILE=turns.prof), off by default
+        self.timings = timings if timings is not None else timings_from_env()
+        self.profiler = profiler if profiler is not None else profiler_from_env()
+
+        # The spaCy model is shared by every Chatbot in the process; start loading it
+        # in the background so it's usually ready by the time the role is answered
+        if warm_up:
+            self.ner_extractor.warm_up()
+
+    @property
+    def current_user_role(self):
+        return self.session.user_role
 
-        print("AI Model: Welcome! Are you a 'buyer' or a 'seller'?")
+    def cache_stats(self):
+        """Returns the hit/miss/eviction counters of the extraction and match caches."""
+        return {
+            'ner': self.ner_extractor.cache.stats() if self.ner_extractor.cache else None,
+            'matches': self.match_cache.stats(),
+        }
 
     def process_user_input(self, user_input):
+        """Handles one message of the single-user REPL and prints the reply."""
+        print(self.respond(self.session, user_input))
+
+    def needs_extraction(self, session, user_input):
+        """True if respond() will run NER on this message (so callers can extract it elsewhere)."""
+        return session.user_role is not None and user_input.lower().strip() not in ACKNOWLEDGEMENTS
+
+    def respond(self, session, user_input, extracted_info=None):
+        """
+        Advances a conversation by one message.
+
+        Args:
+            session (ChatSession): The conversation's state; updated in place.
+            user_input (str): The user's message.
+            extracted_info (dict, optional): NER output for user_input if it was already
+                extracted (e.g. in a worker process); extracted here otherwise.
+
+        Returns:
+            str: The reply, possibly spanning several lines.
+        """
+        with self.timings.stage('turn'):
+            if self.profiler is None:
+                return self._respond(session, user_input, extracted_info)
+            with self.profiler:
+                return self._respond(session, user_input, extracted_info)
+
+    def _respond(self, session, user_input, extracted_info):
         user_input_lower = user_input.lower().strip()
+        reply = []
 
         # --- Conversation State 1: Determine User Role ---
-        if self.current_user_role is None:
+        if session.user_role is None:
             if user_input_lower in ["buyer", "i am a buyer", "i'm a buyer", "i want to buy"]:
-                self.current_user_role = "buyer"
-                print("AI: Alright. What do you wish to buy? (e.g., '100 kg apples for 10 rupees per kg')")
+                session.user_role = "buyer"
+                reply.append("AI: Alright. What do you wish to buy? (e.g., '100 kg apples for 10 rupees per kg')")
             elif user_input_lower in ["seller", "i am a seller", "i'm a seller", "i want to sell"]:
-                self.current_user_role = "seller"
-                print("AI: Okay. What do you wish to sell? (e.g., '50 kg rice at 50 rupees per kg')")
+                session.user_role = "seller"
+                reply.append("AI: Okay. What do you wish to sell? (e.g., '50 kg rice at 50 rupees per kg')")
             else:
-                print("AI: Please specify if you are a 'buyer' or 'seller'.")
-            return
+                reply.append("AI: Please specify if you are a 'buyer' or 'seller'.")
+            return "\n".join(reply)
 
         # --- Conversation State 2: Process Request based on Role ---
-        if self.current_user_role:
-            # If user just acknowledges, re-prompt for the request
-            if user_input_lower in ["alright", "okay", "yes", "sure", "go ahead"]:
-                print(f"AI: Please tell me what you wish to {'buy' if self.current_user_role == 'buyer' else 'sell'}.")
-                return
-
-            # Extract entities from the user's request using NER
-            extracted_info = self.ner_extractor.extract(user_input)
-
-            product = extracted_info.get('product')
-            quantity = extracted_info.get('quantity')
-            price = extracted_info.get('price')
-
-            # Basic validation: A product is essential for a search
-            if not product:
-                print("AI: I couldn't understand the product. Please specify what you wish to buy/sell (e.g., 'apples', 'rice').")
-                # Don't reset role yet, allow user to re-enter the request
-                return
-
-            print(f"AI: Alright, detecting your request for {product}. Let me check the database...")
-            # Optional: for debugging extracted entities
-            # print(f"DEBUG: Extracted: {extracted_info}")
-
-            # --- Core Logic: Search Database and Find Matches ---
-            # Retrieve all listings and find the best matches
-            all_listings = self.data_manager.get_all_listings()
-            top_matches = find_best_matches(extracted_info, all_listings, self.current_user_role)
-
-            # --- Respond with Results ---
-            if top_matches:
-                print(f"\nAI: These are the top {len(top_matches)} {'sellers' if self.current_user_role == 'buyer' else 'buyers'} as per your request for {product}:")
-                for i, match in enumerate(top_matches):
-                    listing = match['listing']
-                    # Format output based on user's role
-                    if self.current_user_role == "buyer":
-                        print(f"  {i+1}. Seller ID: {listing['user_id']} is selling {listing['quantity']:.0f} {listing['unit']} of {listing['product_name']} at {listing['price_per_unit']:.2f} {listing['currency']} per {listing['unit']}.")
-                    else: # seller
-                        print(f"  {i+1}. Buyer ID: {listing['user_id']} is looking to buy {listing['quantity']:.0f} {listing['unit']} of {listing['product_name']} at {listing['price_per_unit']:.2f} {listing['currency']} per {listing['unit']}.")
-            else:
-                print(f"AI: I couldn't find any matching {'sellers' if self.current_user_role == 'buyer' else 'buyers'} for your request.")
+        role = session.user_role
+
+        # If user just acknowledges, re-prompt for the request
+        if user_input_lower in ACKNOWLEDGEMENTS:
+            reply.append(f"AI: Please tell me what you wish to {'buy' if role == 'buyer' else 'sell'}.")
+            return "\n".join(reply)
+
+        # Extract entities from the user's request using NER
+        if extracted_info is None:
+            with self.timings.stage('extract'):
+                extracted_info = self.ner_extractor.extract(user_input)
+
+        product = extracted_info.get('product')
+
+        # Basic validation: A product is essential for a search
+        if not product:
+            reply.append("AI: I couldn't understand the product. Please specify what you wish to buy/sell (e.g., 'apples', 'rice').")
+            # Don't reset role yet, allow user to re-enter the request
+            return "\n".join(reply)
+
+        reply.append(f"AI: Alright, detecting your request for {product}. Let me check the database...")
+
+        # --- Core Logic: Search Database and Find Matches ---
+        # Look up the indexed candidates for this product and find the best matches
+        # (repeated requests are answered from the match cache)
+        with self.timings.stage('match'):
+            top_matches = self.match_cache.find_best_matches(extracted_info, role)
+
+        # --- Respond with Results ---
+        if top_matches:
+            reply.append(f"\nAI: These are the top {len(top_matches)} {'sellers' if role == 'buyer' else 'buyers'} as per your request for {product}:")
+            for i, match in enumerate(top_matches):
+                listing = match['listing']
+                # Format output based on user's role
+                if role == "buyer":
+                    reply.append(f"  {i+1}. Seller ID: {listing['user_id']} is selling {listing['quantity']:.0f} {listing['unit']} of {listing['product_name']} at {listing['price_per_unit']:.2f} {listing['currency']} per {listing['unit']}.")
+                else: # seller
+                    reply.append(f"  {i+1}. Buyer ID: {listing['user_id']} is looking to buy {listing['quantity']:.0f} {listing['unit']} of {listing['product_name']} at {listing['price_per_unit']:.2f} {listing['currency']} per {listing['unit']}.")
+        else:
+            reply.append(f"AI: I couldn't find any matching {'sellers' if role == 'buyer' else 'buyers'} for your request.")
+
+        # Reset role to end the current transaction, allowing a new one to start
+        session.user_role = None
+        reply.append("\nAI: Is there anything else I can help you with? Or, if you want to make another request, please tell me if you are a 'buyer' or 'seller' again.")
+        return "\n".join(reply)
+
+
+def measure_startup():
+    """Prints how long each startup step takes, from constructing a Chatbot to the first spaCy extraction."""
+    import sys
+    import time
+
+    start = time.perf_counter()
+    chatbot = Chatbot(warm_up=False)
+    constructed = time.perf_counter()
+    spacy_imported = 'spacy' in sys.modules
+
+    get_model(chatbot.ner_extractor.model_name)
+    loaded = time.perf_counter()
+
+    # Not a well-formed request, so this one goes through the spaCy pipeline
+    chatbot.ner_extractor.extract("I am looking for some apples")
+    first_extract = time.perf_counter()
+    chatbot.ner_extractor.extract("I am looking for some rice")
+    second_extract = time.perf_counter()
+
+    Chatbot(warm_up=False).ner_extractor.extract("I am looking for some sugar")
+    second_session = time.perf_counter()
+
+    rows = [
+        ("Chatbot() construction", constructed - start, f"spaCy imported: {spacy_imported}"),
+        ("model load", loaded - constructed, ""),
+        ("first spaCy extraction", first_extract - loaded, ""),
+        ("next extraction", second_extract - first_extract, ""),
+        ("new session + first extraction", second_session - second_extract, "model shared"),
+    ]
+    print("\nStartup timings:")
+    for label, seconds, note in rows:
+        print(f"  {label:<32}{seconds * 1e3:9.1f} ms  {note}")
 
-            # Reset role to end the current transaction, allowing a new one to start
-            self.current_user_role = None
-            print("\nAI: Is there anything else I can help you with? Or, if you want to make another request, please tell me if you are a 'buyer' or 'seller' again.")
 
 # --- Main Interaction Loop ---
 if __name__ == "__main__":
-    chatbot = Chatbot()
+    import sys
+    if "--measure-startup" in sys.argv[1:]:
+        measure_startup()
+        sys.exit(0)
+
+    data_manager = None
+    if "--db" in sys.argv[1:]:
+        # Persistent listings: python -m src.main --db listings.sqlite3
+        from src.database.sqlite_data_manager import SQLiteDataManager
+        data_manager = SQLiteDataManager(sys.argv[sys.argv.index("--db") + 1])
+    if "--listings" in sys.argv[1:]:
+        # Stream a JSONL/CSV listing feed in at startup: python -m src.main --listings feed.jsonl
+        from src.database.listing_loader import load_listing_feed, print_progress
+        if data_manager is None:
+            data_manager = DataManager(listings=[])
+        load_listing_feed(sys.argv[sys.argv.index("--listings") + 1], data_manager, progress=print_progress)
+
+    chatbot = Chatbot(data_manager=data_manager)
+    print(WELCOME_MESSAGE)
     while True:
         user_input = input("You: ")
         if user_input.lower() == 'exit':
             print("AI: Goodbye!")
+            if chatbot.timings.enabled:
+                print(chatbot.timings.report())
             break
         chatbot.process_user_input(user_input)
\ No newline at end of file
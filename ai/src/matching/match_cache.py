@@ -0,0 +1,44 @@
+from src.cache.lru_cache import LRUCache
+from src.database.data_manager import normalize_product
+from src.matching.matcher import DEFAULT_TOP_K, find_best_matches
+
+
+class MatchCache:
+    """
+    Bounded LRU cache in front of find_best_matches.
+
+    Results are keyed on the request's (product, unit, currency, role, quantity,
+    price) plus the version of the (type, product) bucket they were computed from.
+    Adding, updating or deleting a listing changes only its own bucket's version,
+    so only results for that product stop matching (and age out of the LRU);
+    everything else keeps hitting. Databases without bucket_version (e.g. a plain
+    list) are not cached.
+    """
+
+    def __init__(self, database, maxsize=1024, k=DEFAULT_TOP_K):
+        self.database = database
+        self.k = k
+        self.cache = LRUCache(maxsize)
+
+    def find_best_matches(self, user_request, role):
+        """Same as matcher.find_best_matches(user_request, database, role, k), served from the cache when possible."""
+        product = user_request.get('product')
+        if not product or not hasattr(self.database, 'bucket_version'):
+            return find_best_matches(user_request, self.database, role, self.k)
+
+        search_type = "selling" if role == "buyer" else "buying"
+        key = (normalize_product(product), user_request.get('unit'), user_request.get('currency'), role,
+               user_request.get('quantity'), user_request.get('price'),
+               self.database.bucket_version(search_type, product))
+
+        matches = self.cache.get(key)
+        if matches is None:
+            matches = find_best_matches(user_request, self.database, role, self.k)
+            self.cache.put(key, matches)
+        return list(matches)
+
+    def clear(self):
+        self.cache.clear()
+
+    def stats(self):
+        return self.cache.stats()
@@ -1,112 +1,358 @@
-def find_best_matches(user_request, database, role):
+import heapq
+
+from src.database.conversion import TOLERANCE, default_conversions, normalized_listing
+from src.database.data_manager import normalize_product
+
+DEFAULT_TOP_K = 3
+
+# Highest score each component can contribute (see score_listing)
+MAX_QUANTITY_SCORE = 5
+MAX_PRICE_SCORE = 5
+
+
+def find_best_matches(user_request, database, role, k=DEFAULT_TOP_K):
     """
-    Finds the top 3 best matching listings from the database based on user's request and role.
+    Finds the top k best matching listings from the database based on user's request and role.
 
     Args:
         user_request (dict): Dictionary with extracted 'product', 'quantity', 'unit', 'price', 'currency'.
-        database (list): The list of product listings (from DataManager).
+        database (DataManager or list): The indexed DataManager, or a plain list of listings
+            (scanned in full).
         role (str): 'buyer' or 'seller'.
+        k (int): Maximum number of matches to return (default 3).
 
     Returns:
         list: A list of dictionaries, each containing a 'listing' and its 'score', sorted by score.
     """
     target_product = user_request.get('product')
-    target_quantity = user_request.get('quantity')
-    target_unit = user_request.get('unit')
-    target_price = user_request.get('price')
-    target_currency = user_request.get('currency')
 
-    if not target_product:
+    if not target_product or k <= 0:
         return [] # Cannot match without a product
 
-    matches = []
-
     # Determine what type of listing to search for based on user's role
     # If user is a 'buyer', we look for 'selling' listings.
     # If user is a 'seller', we look for 'buying' listings.
     search_type = "selling" if role == "buyer" else "buying"
+    product_key = normalize_product(target_product)
+
+    price_ordered = False
+    units = None
+    if hasattr(database, 'iter_candidates'):
+        # Indexed lookup: only the (type, product) bucket is touched, walked lazily
+        # from the role's best normalized price to its worst
+        candidates = database.iter_candidates(search_type, target_product, descending=(role == "seller"))
+        price_ordered = role in ("buyer", "seller")
+        if hasattr(database, 'bucket_profile'):
+            units = database.bucket_profile(search_type, target_product)
+    else:
+        candidates = database
+
+    conversions = getattr(database, 'conversions', None) or default_conversions()
+    return _select_top_k(candidates, user_request, role, k, search_type, product_key, price_ordered,
+                         conversions, units)
+
+
+def find_best_matches_batch(requests, database, k=DEFAULT_TOP_K):
+    """
+    Finds the top k best matching listings for many requests at once.
+
+    Requests are grouped by (product, role) and identical requests within a group are
+    scored only once. On an indexed database each request still walks its bucket
+    lazily in price order and stops early, as in find_best_matches; the group shares
+    the listings fetched so far. A plain list database is bucketed in a single pass
+    instead of one scan per request.
+
+    Args:
+        requests (list): (user_request, role) pairs, as passed to find_best_matches.
+        database (DataManager or list): The indexed DataManager, or a plain list of listings.
+        k (int): Maximum number of matches to return per request (default 3).
+
+    Returns:
+        list: One list of matches per request, in the same order as requests.
+    """
+    requests = list(requests)
+    results = [[] for _ in requests]
+    if k <= 0:
+        return results
+
+    groups = {}
+    for i, (user_request, role) in enumerate(requests):
+        target_product = user_request.get('product')
+        if target_product: # Cannot match without a product
+            groups.setdefault((normalize_product(target_product), role), []).append(i)
+
+    conversions = getattr(database, 'conversions', None) or default_conversions()
+    indexed = hasattr(database, 'iter_candidates')
+    if not indexed:
+        buckets = {}
+        for listing in database:
+            buckets.setdefault((listing['type'], normalize_product(listing['product_name'])), []).append(listing)
+
+    for (product_key, role), indices in groups.items():
+        search_type = "selling" if role == "buyer" else "buying"
+        if indexed:
+            candidates = _SharedWalk(database.iter_candidates(search_type, product_key,
+                                                              descending=(role == "seller")))
+        else:
+            candidates = buckets.get((search_type, product_key), [])
+        price_ordered = indexed and role in ("buyer", "seller")
+        units = database.bucket_profile(search_type, product_key) \
+            if hasattr(database, 'bucket_profile') else None
+
+        seen = {}
+        for i in indices:
+            user_request = requests[i][0]
+            key = (user_request.get('quantity'), user_request.get('unit'),
+                   user_request.get('price'), user_request.get('currency'))
+            if key not in seen:
+                seen[key] = _select_top_k(candidates, user_request, role, k, search_type,
+                                          product_key, price_ordered, conversions, units)
+            results[i] = list(seen[key])
+
+    return results
+
+
+def cross_order_book(database, k=DEFAULT_TOP_K):
+    """
+    Pairs every 'buying' listing with its best 'selling' counterparts in one sweep.
+
+    Each buying listing is matched as a buyer request for its own product,
+    quantity, unit, price and currency.
+
+    Args:
+        database (DataManager or list): The indexed DataManager, or a plain list of listings.
+        k (int): Maximum number of selling listings per buying listing (default 3).
+
+    Returns:
+        list: Dictionaries with the buying 'listing' and its 'matches', one per buying listing.
+    """
+    listings = database.get_all_listings() if hasattr(database, 'get_all_listings') else database
+    bids = [listing for listing in listings if listing['type'] == "buying"]
+    requests = [({'product': bid['product_name'], 'quantity': bid['quantity'], 'unit': bid['unit'],
+                  'price': bid['price_per_unit'], 'currency': bid['currency']}, "buyer") for bid in bids]
+    results = find_best_matches_batch(requests, database, k)
+    return [{'listing': bid, 'matches': matches} for bid, matches in zip(bids, results)]
+
+
+class _SharedWalk:
+    """
+    A lazy candidate walk that can be iterated many times.
+
+    Each listing is fetched from the underlying iterator once, by whichever pass gets
+    furthest first, so the walk only goes as deep as the deepest pass needs.
+    """
+
+    def __init__(self, iterator):
+        self._iterator = iterator
+        self._walked = []
+
+    def __iter__(self):
+        walked = self._walked
+        i = 0
+        while True:
+            if i == len(walked):
+                listing = next(self._iterator, None)
+                if listing is None:
+                    return
+                walked.append(listing)
+            yield walked[i]
+            i += 1
+
 
-    for listing in database:
-        # 1. Product Name Match (case-insensitive)
-        if listing['type'] == search_type and listing['product_name'].lower() == target_product.lower():
-            score = 0
-
-            # 2. Quantity Matching
-            if target_quantity and listing['quantity']:
-                # Basic unit check for now. For a real app, implement robust unit conversion.
-                is_unit_match = False
-                if listing['unit'] and target_unit:
-                    if listing['unit'].lower() == target_unit.lower():
-                        is_unit_match = True
-                    # Add more sophisticated unit conversion if needed (e.g., kg to grams)
-                elif not listing['unit'] and not target_unit: # Both missing units, assume match for simplicity
-                    is_unit_match = True
-
-                if is_unit_match:
-                    quantity_diff = abs(target_quantity - listing['quantity'])
-                    # Reward closer quantities
-                    if quantity_diff == 0:
-                        score += 5 # Perfect quantity match
-                    elif quantity_diff <= 0.05 * target_quantity: # within 5%
-                        score += 4
-                    elif quantity_diff <= 0.10 * target_quantity: # within 10%
-                        score += 3
-                    elif quantity_diff <= 0.25 * target_quantity: # within 25%
-                        score += 2
-                    elif quantity_diff <= 0.50 * target_quantity: # within 50%
-                        score += 1
-                else: # Unit mismatch, penalize or reduce score
-                    # For this demo, if units don't match, we won't add quantity score
-                    pass
-
-            # 3. Price Matching (critical and depends on role)
-            if target_price and listing['price_per_unit']:
-                # Basic currency check. For real app, implement currency conversion.
-                is_currency_match = False
-                if listing['currency'] and target_currency:
-                    if listing['currency'].lower() == target_currency.lower():
-                        is_currency_match = True
-                elif not listing['currency'] and not target_currency: # Both missing currency, assume match
-                    is_currency_match = True
-
-                if is_currency_match:
-                    if role == "buyer":
-                        # Buyer wants a lower price (or equal)
-                        if listing['price_per_unit'] <= target_price:
-                            score += 5 # Excellent price for buyer
-                        elif listing['price_per_unit'] <= target_price * 1.05: # Up to 5% higher
-                            score += 4
-                        elif listing['price_per_unit'] <= target_price * 1.10: # Up to 10% higher
-                            score += 3
-                        elif listing['price_per_unit'] <= target_price * 1.20: # Up to 20% higher
-                            score += 2
-                        elif listing['price_per_unit'] <= target_price * 1.50: # Up to 50% higher
-                            score += 1
-                    elif role == "seller":
-                        # Seller wants a higher price (or equal)
-                        if listing['price_per_unit'] >= target_price:
-                            score += 5 # Excellent price for seller
-                        elif listing['price_per_unit'] >= target_price * 0.95: # Up to 5% lower
-                            score += 4
-                        elif listing['price_per_unit'] >= target_price * 0.90: # Up to 10% lower
-                            score += 3
-                        elif listing['price_per_unit'] >= target_price * 0.80: # Up to 20% lower
-                            score += 2
-                        elif listing['price_per_unit'] >= target_price * 0.50: # Up to 50% lower
-                            score += 1
-                else: # Currency mismatch, penalize or reduce score
-                    pass # For this demo, won't add price score if currency mismatched
-
-
-            # Only consider listings that have a positive score after product match
-            if score > 0:
-                matches.append({'listing': listing, 'score': score})
-
-    # Sort matches: Primary by score (descending), Secondary by price
+def _select_top_k(candidates, user_request, role, k, search_type, product_key, price_ordered, conversions,
+                  units=None):
+    """
+    Scores candidates and keeps the k best.
+
+    If price_ordered, candidates must run from the role's best normalized price to
+    its worst, which lets the scan stop as soon as no remaining listing can enter
+    the top k (see _score_bound; units is the bucket's profile, if known).
+    """
+    # The request is normalized once; listings carry their own normalized form
+    target = conversions.normalize_request(user_request)
+
+    if not (target.quantity or target.unit_price):
+        return [] # Nothing can score, so nothing would be returned
+
+    def scored_matches():
+        top_scores = [] # min-heap of the k best scores so far
+        bound_price, bound = None, None
+        for listing in candidates:
+            # 1. Product Name Match (case/whitespace-insensitive, like the index)
+            if listing['type'] == search_type and normalize_product(listing['product_name']) == product_key:
+                normalized = normalized_listing(listing, conversions)
+                # Missing prices rank like the index orders them: before everything else
+                price = normalized.base_price or float('-inf')
+
+                # In price order, stop once no listing from here on can beat the k-th best
+                # score, or score at all (an equal score doesn't outrank it: its price is no better)
+                if price_ordered:
+                    if price != bound_price:
+                        bound_price, bound = price, _score_bound(price, target, role, units)
+                    if bound <= (top_scores[0] if len(top_scores) == k else 0):
+                        return
+
+                score = score_listing(listing, user_request, role, conversions, target, normalized)
+
+                # Only consider listings that have a positive score after product match
+                if score > 0:
+                    yield {'listing': listing, 'score': score}, price
+                    if price_ordered:
+                        if len(top_scores) < k:
+                            heapq.heappush(top_scores, score)
+                        else:
+                            heapq.heappushpop(top_scores, score)
+
+    # Rank matches: Primary by score (descending), Secondary by normalized price
     # For buyers, lower price is better. For sellers, higher price is better.
+    # heapq.nsmallest keeps only k entries and is equivalent to sorted(...)[:k]
     if role == "buyer":
-        matches.sort(key=lambda x: (-x['score'], x['listing']['price_per_unit']))
+        ranked = heapq.nsmallest(k, scored_matches(), key=lambda x: (-x[0]['score'], x[1]))
     elif role == "seller":
-        matches.sort(key=lambda x: (-x['score'], -x['listing']['price_per_unit']))
+        ranked = heapq.nsmallest(k, scored_matches(), key=lambda x: (-x[0]['score'], -x[1]))
+    else:
+        ranked = list(scored_matches())[:k]
+    return [match for match, _ in ranked]
+
+
+def _at_most(value, limit):
+    return value <= limit + abs(limit) * TOLERANCE
+
+
+def _at_least(value, limit):
+    return value >= limit - abs(limit) * TOLERANCE
+
+
+def score_listing(listing, user_request, role, conversions=None, target=None, normalized=None):
+    """
+    Scores a single listing against a user's request (0-10).
+
+    This is the reference scoring: up to 5 points for quantity proximity and up to
+    5 points for price proximity, in the direction the role prefers. Product and
+    listing type are not checked here. Quantities and prices are compared after
+    normalization (see conversion.ConversionTable), so 500 gram matches 0.5 kg and
+    a price in dollars is compared with one in rupees.
+
+    Args:
+        listing (dict): A product listing.
+        user_request (dict): Dictionary with extracted 'quantity', 'unit', 'price', 'currency'.
+        role (str): 'buyer' or 'seller'.
+        conversions (ConversionTable, optional): Table used for anything not normalized yet.
+        target (Normalized, optional): The request, already normalized.
+        normalized (Normalized, optional): The listing, already normalized.
 
-    return matches[:3] # Return top 3 matches
\ No newline at end of file
+    Returns:
+        int: The listing's score.
+    """
+    conversions = conversions or default_conversions()
+    if target is None:
+        target = conversions.normalize_request(user_request)
+    if normalized is None:
+        normalized = normalized_listing(listing, conversions)
+
+    score = 0
+
+    # 2. Quantity Matching
+    if target.quantity and normalized.quantity:
+        # Units match when they share a dimension (kg/gram/lb, liter/milliliter, units/dozen),
+        # are the same unconvertible unit, or are both missing
+        if normalized.dimension == target.dimension:
+            score += _quantity_score(abs(target.quantity - normalized.quantity), target.quantity)
+        else: # Incompatible units (e.g. kg vs liter), no quantity score
+            pass
+
+    # 3. Price Matching (critical and depends on role)
+    if target.unit_price and normalized.unit_price:
+        # Currencies match when both convert to the base currency, are the same
+        # currency without a known rate, or are both missing
+        if normalized.currency == target.currency:
+            if target.dimension is not None and normalized.dimension == target.dimension:
+                # Same dimension: compare prices per base unit (per kg, per liter, ...)
+                listing_price, target_price = normalized.base_price, target.base_price
+            else:
+                # Otherwise the request's price is taken to be per the listing's unit
+                listing_price, target_price = normalized.unit_price, target.unit_price
+
+            score += _price_score(listing_price, target_price, role)
+        else: # Currency without an exchange rate, no price score
+            pass
+
+    return score
+
+
+def _score_bound(price, target, role, units=None):
+    """
+    Best score a listing at this normalized price, or a worse one, can still reach.
+
+    Without units, listings in the request's dimension get at most full quantity points
+    plus this price's tier, while listings in any other dimension compare prices per
+    their own unit (not ordered by the walk) and may get full price points but no
+    quantity points. With units ((dimension, factor) -> [min, max] quantity, see
+    DataManager.bucket_profile) each unit present is bounded on its own: its price per
+    own unit is price * factor, ordered like the walk, and its quantity points are
+    capped by how close its quantity range comes to the request.
+    """
+    max_quantity = MAX_QUANTITY_SCORE if target.quantity else 0
+    max_price = MAX_PRICE_SCORE if target.unit_price else 0
+    if units is None:
+        same_dimension = max_quantity + (_price_score(price, target.base_price, role) if max_price else 0)
+        return max(same_dimension, max_price)
+
+    best = 0
+    for (dimension, factor), (low, high) in units.items():
+        points = 0
+        if max_price:
+            if target.dimension is not None and dimension == target.dimension:
+                points = _price_score(price, target.base_price, role) # Compared per base unit
+            else:
+                points = _price_score(price * factor, target.unit_price, role) # Per the listing's unit
+        if max_quantity and dimension == target.dimension and low <= high:
+            nearest = min(max(target.quantity, low), high)
+            points += _quantity_score(abs(target.quantity - nearest), target.quantity)
+        best = max(best, points)
+    return best
+
+
+def _quantity_score(quantity_diff, target_quantity):
+    """Quantity points (0-5) for a listing whose quantity is quantity_diff away from the request's."""
+    # Reward closer quantities
+    if quantity_diff <= TOLERANCE * target_quantity:
+        return 5 # Perfect quantity match
+    elif _at_most(quantity_diff, 0.05 * target_quantity): # within 5%
+        return 4
+    elif _at_most(quantity_diff, 0.10 * target_quantity): # within 10%
+        return 3
+    elif _at_most(quantity_diff, 0.25 * target_quantity): # within 25%
+        return 2
+    elif _at_most(quantity_diff, 0.50 * target_quantity): # within 50%
+        return 1
+    return 0
+
+
+def _price_score(listing_price, target_price, role):
+    """Price points (0-5) for a listing price against the request's, in the direction the role prefers."""
+    if role == "buyer":
+        # Buyer wants a lower price (or equal)
+        if _at_most(listing_price, target_price):
+            return 5 # Excellent price for buyer
+        elif _at_most(listing_price, target_price * 1.05): # Up to 5% higher
+            return 4
+        elif _at_most(listing_price, target_price * 1.10): # Up to 10% higher
+            return 3
+        elif _at_most(listing_price, target_price * 1.20): # Up to 20% higher
+            return 2
+        elif _at_most(listing_price, target_price * 1.50): # Up to 50% higher
+            return 1
+    elif role == "seller":
+        # Seller wants a higher price (or equal)
+        if _at_least(listing_price, target_price):
+            return 5 # Excellent price for seller
+        elif _at_least(listing_price, target_price * 0.95): # Up to 5% lower
+            return 4
+        elif _at_least(listing_price, target_price * 0.90): # Up to 10% lower
+            return 3
+        elif _at_least(listing_price, target_price * 0.80): # Up to 20% lower
+            return 2
+        elif _at_least(listing_price, target_price * 0.50): # Up to 50% lower
+            return 1
+    return 0
@@ -0,0 +1,127 @@
+import numpy as np
+
+from src.database.conversion import TOLERANCE
+from src.matching.matcher import DEFAULT_TOP_K
+
+# (multiplier of the target, points) tiers, mirroring score_listing
+QUANTITY_TIERS = ((0.05, 4), (0.10, 3), (0.25, 2), (0.50, 1))
+BUYER_PRICE_TIERS = ((1.0, 5), (1.05, 4), (1.10, 3), (1.20, 2), (1.50, 1))
+SELLER_PRICE_TIERS = ((1.0, 5), (0.95, 4), (0.90, 3), (0.80, 2), (0.50, 1))
+
+
+def _at_most(values, limit):
+    return values <= limit + abs(limit) * TOLERANCE
+
+
+def _at_least(values, limit):
+    return values >= limit - abs(limit) * TOLERANCE
+
+
+def score_rows(store, rows, user_request, role, target=None):
+    """
+    Scores many listings of a ColumnarListingStore in one pass.
+
+    Produces exactly the scores score_listing would give each listing.
+
+    Args:
+        store (ColumnarListingStore): The columnar listings.
+        rows (np.ndarray): Row indices to score.
+        user_request (dict): Dictionary with extracted 'quantity', 'unit', 'price', 'currency'.
+        role (str): 'buyer' or 'seller'.
+        target (Normalized, optional): The request, already normalized with store.conversions.
+
+    Returns:
+        np.ndarray: Integer scores aligned with rows.
+    """
+    if target is None:
+        target = store.conversions.normalize_request(user_request)
+    target_dimension = store.encode('dimension', target.dimension)
+    same_dimension = store.dimension[rows] == target_dimension
+
+    scores = np.zeros(len(rows), dtype=np.int64)
+
+    # Quantity Matching: units must share a dimension (or both be missing)
+    if target.quantity:
+        quantity = store.quantity[rows]
+        diff = np.abs(target.quantity - quantity)
+        conditions = [diff <= TOLERANCE * target.quantity]
+        conditions += [_at_most(diff, fraction * target.quantity) for fraction, _ in QUANTITY_TIERS]
+        points = [5] + [p for _, p in QUANTITY_TIERS]
+        eligible = (quantity != 0) & same_dimension
+        scores += np.where(eligible, np.select(conditions, points, 0), 0)
+
+    # Price Matching: currencies must convert to the same one (or both be missing)
+    if target.unit_price and role in ("buyer", "seller"):
+        unit_price = store.unit_price[rows]
+        eligible = (unit_price != 0) & (store.currency[rows] == store.encode('currency', target.currency))
+        # Per base unit within the request's dimension, per the listing's own unit otherwise
+        use_base = same_dimension if target.dimension is not None else np.zeros(len(rows), dtype=bool)
+        listing_price = np.where(use_base, store.base_price[rows], unit_price)
+
+        compare, tiers = (_at_most, BUYER_PRICE_TIERS) if role == "buyer" else (_at_least, SELLER_PRICE_TIERS)
+        conditions = [np.where(use_base, compare(listing_price, target.base_price * m),
+                               compare(listing_price, target.unit_price * m)) for m, _ in tiers]
+        scores += np.where(eligible, np.select(conditions, [p for _, p in tiers], 0), 0)
+
+    return scores
+
+
+def find_best_matches_vectorized(user_request, store, role, k=DEFAULT_TOP_K):
+    """
+    Vectorized equivalent of find_best_matches over a ColumnarListingStore.
+
+    Returns the same matches, in the same order, as find_best_matches run on
+    store.listings; ties are broken by row order like the reference's stable sort.
+
+    Args:
+        user_request (dict): Dictionary with extracted 'product', 'quantity', 'unit', 'price', 'currency'.
+        store (ColumnarListingStore): The columnar listings.
+        role (str): 'buyer' or 'seller'.
+        k (int): Maximum number of matches to return (default 3).
+
+    Returns:
+        list: A list of dictionaries, each containing a 'listing' and its 'score', sorted by score.
+    """
+    target_product = user_request.get('product')
+    if not target_product or k <= 0:
+        return []
+
+    search_type = "selling" if role == "buyer" else "buying"
+    rows = store.candidate_rows(search_type, target_product)
+    scores = score_rows(store, rows, user_request, role)
+
+    positive = scores > 0
+    rows, scores = rows[positive], scores[positive]
+
+    if role not in ("buyer", "seller"):
+        # The reference leaves matches unsorted for unknown roles
+        top = np.arange(min(k, len(rows)))
+    else:
+        # Missing prices (stored as 0.0) rank first, like the reference's -inf
+        price = np.where(store.base_price[rows] != 0, store.base_price[rows], -np.inf)
+        price_key = price if role == "buyer" else -price
+        top = _top_k(scores, price_key, k)
+
+    return [{'listing': store.listings[rows[i]], 'score': int(scores[i])} for i in top]
+
+
+def _top_k(scores, price_key, k):
+    """Positions of the k best entries ordered by (-score, price_key, position)."""
+    n = len(scores)
+    candidates = np.arange(n)
+    if n > k:
+        # Scores are small integers: everything above the k-th best score is in,
+        # and the remaining slots go to the best prices among that score
+        kth_score = np.partition(scores, n - k)[n - k]
+        above = np.flatnonzero(scores > kth_score)
+        tied = np.flatnonzero(scores == kth_score)
+        needed = k - len(above)
+        if needed < len(tied):
+            tied_keys = price_key[tied]
+            cutoff = tied_keys[np.argpartition(tied_keys, needed - 1)[needed - 1]]
+            # Keep every entry priced at the cutoff so position decides ties below
+            tied = tied[tied_keys <= cutoff]
+        candidates = np.concatenate([above, tied])
+
+    order = np.lexsort((candidates, price_key[candidates], -scores[candidates]))
+    return candidates[order[:k]]
@@ -1,36 +1,211 @@
-import spacy
-from spacy.matcher import Matcher
+import gc
 import re
 import json
+import threading
+
+from src.cache.lru_cache import LRUCache
+from src.nlp.normalization import NUMBER_PATTERN, EntityNormalizer, alternation, parse_number
+
+# spaCy itself is imported lazily (see _load_model) so importing this module,
+# and answering fast-path messages, never pays for it.
+DEFAULT_MODEL = "en_core_web_sm"
+
+# One loaded pipeline per model name, shared by every extractor in the process
+_models = {}
+_models_lock = threading.Lock()
+
+
+def _load_model(model_name):
+    import spacy
+    return spacy.load(model_name)
+
+
+def get_model(model_name=DEFAULT_MODEL):
+    """Returns the process-wide spaCy pipeline for model_name, loading it on first use."""
+    nlp = _models.get(model_name)
+    if nlp is None:
+        with _models_lock:
+            nlp = _models.get(model_name)
+            if nlp is None:
+                nlp = _models[model_name] = _load_model(model_name)
+    return nlp
+
+
+def warm_up_model(model_name=DEFAULT_MODEL):
+    """
+    Starts loading the model in a background thread and returns the thread.
+
+    Extractions that need the model before it's ready simply wait for the load.
+    """
+    thread = threading.Thread(target=get_model, args=(model_name,), name=f"load-{model_name}", daemon=True)
+    thread.start()
+    return thread
+
+
+def preload_model(model_name=DEFAULT_MODEL, freeze=True):
+    """
+    Loads the model in a parent process before it forks its workers.
+
+    Children then inherit the loaded pipeline copy-on-write instead of loading their own.
+    With freeze=True the objects created so far are moved out of the garbage collector's
+    reach (gc.freeze) so collections in the children don't touch, and copy, those pages.
+    """
+    nlp = get_model(model_name)
+    if freeze:
+        gc.collect()
+        gc.freeze()
+    return nlp
+
+# Extraction results kept per extractor (see AdvancedNERExtractor.cache)
+DEFAULT_CACHE_SIZE = 4096
+
+
+def cache_key(text):
+    """Normalizes a message for the extraction cache: case-insensitive, whitespace collapsed."""
+    return " ".join(text.lower().split())
+
+# Pipeline components whose output extract() never reads: it only needs the
+# entity recognizer and the lexical attributes (LOWER, LIKE_NUM) used by the Matcher.
+UNUSED_COMPONENTS = ("tagger", "parser", "attribute_ruler", "lemmatizer", "senter", "morphologizer")
+
+class FastPathExtractor:
+    """
+    Regex extractor for well-formed requests such as "100 kg apples for 10 rupees per kg".
+
+    All product keywords, units and currencies from the config are compiled into a
+    single alternation. A message is only accepted when it yields exactly one product,
+    one quantity with a unit, one price with a currency and no other numbers; anything
+    else is left to the spaCy pipeline. hits/misses count how often each happened.
+    """
+
+    def __init__(self, patterns, normalizer):
+        self.hits = 0
+        self.misses = 0
+        self.regex = self._compile(patterns.get("product_keywords", []), normalizer.unit_tokens,
+                                   normalizer.currency_tokens)
+
+    def _compile(self, products, units, currencies):
+        if not (products and units and currencies):
+            return None
+
+        unit = rf'(?:{alternation(units)})(?!\w)'
+        currency = rf'(?:{alternation(currencies)})(?![a-z])'
+        return re.compile(
+            rf'(?P<quantity>(?P<qty_num>{NUMBER_PATTERN})\s*(?P<unit>{unit}))'
+            rf'|(?P<price_pre>(?<!\w)(?P<pre_currency>{currency})\s*(?P<pre_num>{NUMBER_PATTERN}))'
+            rf'|(?P<price_post>(?P<post_num>{NUMBER_PATTERN})\s*(?P<post_currency>{currency}))'
+            rf'|(?P<product>(?<!\w)(?:{alternation(products)})(?!\w))'
+            # Tried last: any digit the alternatives above didn't consume, even inside a word ("20k", "2days")
+            rf'|(?P<number>\d)',
+            re.IGNORECASE,
+        )
+
+    def extract(self, text):
+        """Returns the raw (un-normalized) entities, or None if the message needs the full pipeline."""
+        entities = self._match(text) if self.regex is not None else None
+        if entities is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entities
+
+    def _match(self, text):
+        products, quantities, prices = [], [], []
+        for match in self.regex.finditer(text):
+            if match.group('quantity'):
+                quantities.append((parse_number(match.group('qty_num')), match.group('unit').lower()))
+            elif match.group('price_pre'):
+                prices.append((parse_number(match.group('pre_num')), match.group('pre_currency').lower()))
+            elif match.group('price_post'):
+                prices.append((parse_number(match.group('post_num')), match.group('post_currency').lower()))
+            elif match.group('product'):
+                products.append(match.group('product'))
+            elif match.group('number'):
+                return None # A number we can't attribute, let spaCy decide
+
+        if len({p.lower() for p in products}) != 1 or len(quantities) != 1 or len(prices) != 1:
+            return None
+
+        (quantity, unit), (price, currency) = quantities[0], prices[0]
+        return {'product': products[0], 'quantity': quantity, 'unit': unit, 'price': price, 'currency': currency}
+
+    def stats(self):
+        """Returns the hit/miss counters and the share of messages that bypassed spaCy."""
+        total = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hits / total if total else 0.0}
+
 
 class AdvancedNERExtractor:
-    def __init__(self, config_path='config/ner_patterns.json'):
-        self.nlp = spacy.load("en_core_web_sm")
-        self.matcher = Matcher(self.nlp.vocab)
+    def __init__(self, config_path='config/ner_patterns.json', use_fast_path=True, model_name=DEFAULT_MODEL,
+                 cache_size=DEFAULT_CACHE_SIZE):
+        # The spaCy model and Matcher are created on first use (see the nlp and matcher properties)
+        self.model_name = model_name
+        self._nlp = None
+        self._matcher = None
+        self._disabled_components = None
 
         self.patterns = self._load_patterns(config_path)
+        # Unit/currency lookup tables and regexes, compiled once from the config
+        self.normalizer = EntityNormalizer(self.patterns)
+
+        # Regex fast path tried before spaCy for well-formed requests
+        self.fast_path = FastPathExtractor(self.patterns, self.normalizer) if use_fast_path else None
+
+        # Results of recent messages, keyed on cache_key(text). Messages differing only in
+        # case share an entry, so a cached product keeps the casing of the first one seen.
+        self.cache = LRUCache(cache_size) if cache_size else None
+
+    @property
+    def nlp(self):
+        if self._nlp is None:
+            self._nlp = get_model(self.model_name)
+        return self._nlp
+
+    @property
+    def matcher(self):
+        if self._matcher is None:
+            self._matcher = self._build_matcher()
+        return self._matcher
+
+    @property
+    def disabled_components(self):
+        if self._disabled_components is None:
+            self._disabled_components = self._unused_components()
+        return self._disabled_components
+
+    def warm_up(self):
+        """Loads the model in the background, e.g. while the user is still choosing a role."""
+        if self._nlp is None:
+            return warm_up_model(self.model_name)
+        return None
+
+    def _build_matcher(self):
+        from spacy.matcher import Matcher
+        matcher = Matcher(self.nlp.vocab)
 
         # Define patterns for product, quantity, and price using loaded config
         product_keywords = self.patterns.get("product_keywords", [])
         if product_keywords:
-            self.matcher.add("PRODUCT_KEYWORD", [[{"LOWER": {"IN": product_keywords}}]])
+            matcher.add("PRODUCT_KEYWORD", [[{"LOWER": {"IN": product_keywords}}]])
 
-        quantity_units = self.patterns.get("quantity_units", [])
+        quantity_units = self.normalizer.unit_tokens
         if quantity_units:
-            self.matcher.add("QUANTITY", [
+            matcher.add("QUANTITY", [
                 [{"LIKE_NUM": True}, {"LOWER": {"IN": quantity_units}}]
             ])
             # Also add a pattern for just numbers, sometimes units are implied or missing
-            self.matcher.add("QUANTITY_NUM_ONLY", [[{"LIKE_NUM": True}]])
+            matcher.add("QUANTITY_NUM_ONLY", [[{"LIKE_NUM": True}]])
 
 
-        price_currencies = self.patterns.get("price_currencies", [])
+        price_currencies = self.normalizer.currency_tokens
         if price_currencies:
-            self.matcher.add("PRICE", [
+            matcher.add("PRICE", [
                 [{"LOWER": {"IN": price_currencies}, "OP": "?"}, {"LIKE_NUM": True}], # e.g., "100 rupees", "rs 100"
                 [{"LIKE_NUM": True}, {"LOWER": {"IN": price_currencies}, "OP": "?"}]  # e.g., "$50", "50 dollars"
             ])
 
+        return matcher
+
     def _load_patterns(self, config_path):
         try:
             with open(config_path, 'r') as f:
@@ -40,9 +215,70 @@ class AdvancedNERExtractor:
             print(f"Error: Config file not found at {config_path}. Using default patterns if available.")
             return {} # Return empty dict if file not found, handle gracefully
 
+    def _unused_components(self):
+        disabled = [name for name in self.nlp.pipe_names if name in UNUSED_COMPONENTS]
+        # The shared tok2vec can only go if the NER doesn't listen to it (en_core_web_sm's NER has its own)
+        if "tok2vec" in self.nlp.pipe_names:
+            listeners = getattr(self.nlp.get_pipe("tok2vec"), "listening_components", [])
+            if not any(name in listeners for name in self.nlp.pipe_names if name not in disabled):
+                disabled.append("tok2vec")
+        return disabled
+
     def extract(self, text):
-        doc = self.nlp(text)
+        extracted_entities = self.extract_fast(text)
+        if extracted_entities is not None:
+            return extracted_entities
+        extracted_entities = self._extract_from_doc(self.nlp(text, disable=self.disabled_components))
+        self.remember(text, extracted_entities)
+        return extracted_entities
+
+    def extract_fast(self, text):
+        """Returns the entities for text from the cache or the fast path, or None if it needs the spaCy pipeline."""
+        if self.cache is not None:
+            cached = self.cache.get(cache_key(text))
+            if cached is not None:
+                return dict(cached)
+        if self.fast_path is None:
+            return None
+        extracted_entities = self.fast_path.extract(text)
+        if extracted_entities is None:
+            return None
+        extracted_entities = self._normalize(extracted_entities)
+        self.remember(text, extracted_entities)
+        return extracted_entities
+
+    def remember(self, text, extracted_entities):
+        """Caches entities extracted for text elsewhere (e.g. by a worker process)."""
+        if self.cache is not None:
+            self.cache.put(cache_key(text), dict(extracted_entities))
+
+    def extract_many(self, texts, batch_size=256, n_process=1):
+        """
+        Extracts entities from many messages using spaCy's batched nlp.pipe.
+
+        Args:
+            texts (iterable): The messages.
+            batch_size (int): Number of messages per spaCy batch.
+            n_process (int): Number of worker processes for spaCy (1 = in-process).
 
+        Returns:
+            list: One extracted-entities dict per message, in input order.
+        """
+        texts = list(texts)
+        results = [self.extract_fast(text) for text in texts]
+
+        # Only the messages the fast path couldn't handle go through spaCy
+        pending = [i for i, result in enumerate(results) if result is None]
+        if not pending:
+            return results
+        docs = self.nlp.pipe((texts[i] for i in pending), batch_size=batch_size, n_process=n_process,
+                             disable=self.disabled_components)
+        for i, doc in zip(pending, docs):
+            results[i] = self._extract_from_doc(doc)
+            self.remember(texts[i], results[i])
+        return results
+
+    def _extract_from_doc(self, doc):
         extracted_entities = {
             'product': None,
             'quantity': None,
@@ -56,21 +292,21 @@ class AdvancedNERExtractor:
             if ent.label_ == "PRODUCT" and not extracted_entities['product']:
                 extracted_entities['product'] = ent.text
             elif ent.label_ == "QUANTITY" and not extracted_entities['quantity']:
-                num_match = re.search(r'\d+(\.\d+)?', ent.text)
-                if num_match:
-                    extracted_entities['quantity'] = float(num_match.group())
+                number = parse_number(ent.text)
+                if number is not None:
+                    extracted_entities['quantity'] = number
                     # Attempt to extract unit from SpaCy's QUANTITY entity text
-                    unit_match = re.search(r'(kg|kgs|kilograms|liter|liters|units|g|grams|ml|milliliters|dozen|pounds|lbs|oz|ounces|bags|crates|boxes|cans|bottles|packs|pieces)', ent.text, re.IGNORECASE)
-                    if unit_match:
-                        extracted_entities['unit'] = unit_match.group().lower()
+                    unit = self.normalizer.find_unit(ent.text)
+                    if unit:
+                        extracted_entities['unit'] = unit
             elif ent.label_ == "MONEY" and not extracted_entities['price']:
-                num_match = re.search(r'\d+(\.\d+)?', ent.text)
-                if num_match:
-                    extracted_entities['price'] = float(num_match.group())
+                number = parse_number(ent.text)
+                if number is not None:
+                    extracted_entities['price'] = number
                     # Attempt to extract currency from SpaCy's MONEY entity text
-                    currency_match = re.search(r'(rupees|rs|dollars|usd|eur|pounds|inr|aed|qar|qatar riyals|riyals|\$|€|£)', ent.text, re.IGNORECASE)
-                    if currency_match:
-                        extracted_entities['currency'] = currency_match.group().lower()
+                    currency = self.normalizer.find_currency(ent.text)
+                    if currency:
+                        extracted_entities['currency'] = currency
 
         # --- Phase 2: Use custom Matcher for more specific or missed patterns ---
         matches = self.matcher(doc)
@@ -81,42 +317,32 @@ class AdvancedNERExtractor:
             if label == "PRODUCT_KEYWORD" and not extracted_entities['product']:
                 extracted_entities['product'] = span.text
             elif label == "QUANTITY" and not extracted_entities['quantity']:
-                num_match = re.search(r'\d+(\.\d+)?', span.text)
-                if num_match:
-                    extracted_entities['quantity'] = float(num_match.group())
-                    unit_match = re.search(r'(kg|kgs|kilograms|liter|liters|units|g|grams|ml|milliliters|dozen|pounds|lbs|oz|ounces|bags|crates|boxes|cans|bottles|packs|pieces)', span.text, re.IGNORECASE)
-                    if unit_match:
-                        extracted_entities['unit'] = unit_match.group().lower()
+                number = parse_number(span.text)
+                if number is not None:
+                    extracted_entities['quantity'] = number
+                    unit = self.normalizer.find_unit(span.text)
+                    if unit:
+                        extracted_entities['unit'] = unit
             elif label == "QUANTITY_NUM_ONLY" and not extracted_entities['quantity']:
                  # This captures numbers not associated with a unit by SpaCy or QUANTITY matcher
-                 num_match = re.search(r'\d+(\.\d+)?', span.text)
-                 if num_match:
-                     extracted_entities['quantity'] = float(num_match.group())
+                 number = parse_number(span.text)
+                 if number is not None:
+                     extracted_entities['quantity'] = number
                      # No unit extracted here, it's just a number
             elif label == "PRICE" and not extracted_entities['price']:
-                num_match = re.search(r'\d+(\.\d+)?', span.text)
-                if num_match:
-                    extracted_entities['price'] = float(num_match.group())
-                    currency_match = re.search(r'(rupees|rs|dollars|usd|eur|pounds|inr|aed|qar|qatar riyals|riyals|\$|€|£)', span.text, re.IGNORECASE)
-                    if currency_match:
-                        extracted_entities['currency'] = currency_match.group().lower()
-
-        # --- Phase 3: Normalization (optional but good practice) ---
-        if extracted_entities['unit']:
-            normalized_units = {
-                'kgs': 'kg', 'kilograms': 'kg', 'pounds': 'lb', 'lbs': 'lb',
-                'oz': 'ounce', 'ounces': 'ounce', 'g': 'gram', 'grams': 'gram',
-                'liters': 'liter', 'ml': 'milliliter', 'milliliters': 'milliliter',
-                'bags': 'bag', 'crates': 'crate', 'boxes': 'box', 'cans': 'can',
-                'bottles': 'bottle', 'packs': 'pack', 'pieces': 'piece'
-            }
-            extracted_entities['unit'] = normalized_units.get(extracted_entities['unit'], extracted_entities['unit'])
+                number = parse_number(span.text)
+                if number is not None:
+                    extracted_entities['price'] = number
+                    currency = self.normalizer.find_currency(span.text)
+                    if currency:
+                        extracted_entities['currency'] = currency
 
-        if extracted_entities['currency']:
-            normalized_currencies = {
-                'rs': 'rupees', 'inr': 'rupees', 'usd': 'dollars', '$': 'dollars',
-                '€': 'eur', '£': 'pounds', 'qar': 'qatar riyals', 'riyals': 'qatar riyals'
-            }
-            extracted_entities['currency'] = normalized_currencies.get(extracted_entities['currency'], extracted_entities['currency'])
+        return self._normalize(extracted_entities)
 
-        return extracted_entities
\ No newline at end of file
+    def _normalize(self, extracted_entities):
+        # --- Phase 3: Normalization to canonical units/currencies ---
+        if extracted_entities['unit']:
+            extracted_entities['unit'] = self.normalizer.unit(extracted_entities['unit'])
+        if extracted_entities['currency']:
+            extracted_entities['currency'] = self.normalizer.currency(extracted_entities['currency'])
+        return extracted_entities
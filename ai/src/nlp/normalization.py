@@ -0,0 +1,81 @@
+import re
+
+# Numbers with optional thousands separators and decimals: "12", "12.5", "1,200", "1,200.50",
+# including Indian lakh/crore grouping: "1,20,000", "1,00,00,000"
+NUMBER_PATTERN = r'(?:\d{1,3}(?:,\d{3})+|\d{1,2}(?:,\d{2})*,\d{3}|\d+)(?:\.\d+)?'
+NUMBER_REGEX = re.compile(NUMBER_PATTERN)
+
+
+def alternation(tokens):
+    """Regex alternation of literal tokens, longest first so "qatar riyals" wins over "riyals"."""
+    return '|'.join(re.escape(token) for token in sorted(set(tokens), key=len, reverse=True))
+
+
+def parse_number(text):
+    """Returns the first number in text as a float (thousands separators removed), or None."""
+    match = NUMBER_REGEX.search(text)
+    return float(match.group().replace(',', '')) if match else None
+
+
+class EntityNormalizer:
+    """
+    Token-to-canonical lookup tables for units and currencies, built once from the config.
+
+    Each table contains the tokens listed under "quantity_units"/"price_currencies"
+    plus every alias under "unit_aliases"/"currency_aliases" (canonical -> [aliases]).
+    Units and currencies keep separate tables because some tokens, like "pounds",
+    mean different things in each. The compiled regexes find the first known token
+    in a span of text.
+    """
+
+    def __init__(self, patterns):
+        self.unit_table = self._build_table(patterns.get("quantity_units", []), patterns.get("unit_aliases", {}))
+        self.currency_table = self._build_table(patterns.get("price_currencies", []),
+                                                patterns.get("currency_aliases", {}))
+        self.unit_regex = self._compile(self.unit_table)
+        self.currency_regex = self._compile(self.currency_table)
+
+    @property
+    def unit_tokens(self):
+        return list(self.unit_table)
+
+    @property
+    def currency_tokens(self):
+        return list(self.currency_table)
+
+    @staticmethod
+    def _build_table(tokens, aliases):
+        table = {token.lower(): token.lower() for token in tokens}
+        for canonical, names in aliases.items():
+            canonical = canonical.lower()
+            table[canonical] = canonical
+            for name in names:
+                table[name.lower()] = canonical
+        return table
+
+    @staticmethod
+    def _compile(table):
+        if not table:
+            return None
+        # Letters may not run on into the token ("g" must not match inside "bags"); digits and symbols may
+        return re.compile(rf'(?<![a-z])(?:{alternation(table)})(?![a-z])', re.IGNORECASE)
+
+    def unit(self, token):
+        """Canonical unit for a token; unknown tokens are returned lowercased."""
+        token = token.lower()
+        return self.unit_table.get(token, token)
+
+    def currency(self, token):
+        """Canonical currency for a token; unknown tokens are returned lowercased."""
+        token = token.lower()
+        return self.currency_table.get(token, token)
+
+    def find_unit(self, text):
+        """Canonical form of the first unit mentioned in text, or None."""
+        match = self.unit_regex.search(text) if self.unit_regex else None
+        return self.unit(match.group()) if match else None
+
+    def find_currency(self, text):
+        """Canonical form of the first currency mentioned in text, or None."""
+        match = self.currency_regex.search(text) if self.currency_regex else None
+        return self.currency(match.group()) if match else None
@@ -0,0 +1,136 @@
+"""
+Asyncio chat server: one Chatbot shared by many concurrent sessions.
+
+Protocol: one TCP connection is one session. The client sends one message per
+line (UTF-8); the server answers each, starting with the welcome message, with
+one JSON line {"session": <id>, "reply": <text>}. Sending 'exit' ends the session.
+
+Usage (from the ai/ directory):
+    python -m src.server.chat_server [--host 127.0.0.1] [--port 8765] [--workers N] [--db FILE] [--listings FEED]
+                                     [--model en_core_web_sm]
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import signal
+
+from src.main import WELCOME_MESSAGE, ChatSession, Chatbot
+from src.nlp.ner_extractor import DEFAULT_MODEL
+from src.server.extraction_pool import ExtractionPool, ExtractionPoolClosed
+
+
+class ChatServer:
+    def __init__(self, chatbot, pool, host='127.0.0.1', port=8765):
+        self.chatbot = chatbot
+        self.pool = pool
+        self.host = host
+        self.port = port
+        self.active_sessions = 0
+        self.total_sessions = 0
+        self._session_ids = itertools.count(1)
+        self._server = None
+        self._sessions = {} # writer -> the task serving that connection
+
+    async def start(self):
+        """Starts listening; returns the (host, port) actually bound (port 0 picks a free one)."""
+        await self.pool.start()
+        self._server = await asyncio.start_server(self.handle_connection, self.host, self.port, backlog=4096)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def close(self):
+        """Stops listening, ends the open sessions and shuts the extraction pool down."""
+        if self._server is not None:
+            self._server.close()
+            # From Python 3.12 wait_closed also waits for every connection to end
+            for writer in self._sessions:
+                writer.close()
+        await self.pool.close() # Fails the messages still waiting on NER
+        await asyncio.gather(*self._sessions.values(), return_exceptions=True)
+        if self._server is not None:
+            await self._server.wait_closed()
+
+    async def handle_connection(self, reader, writer):
+        session = ChatSession(session_id=next(self._session_ids))
+        self.active_sessions += 1
+        self.total_sessions += 1
+        self._sessions[writer] = asyncio.current_task()
+        try:
+            await self._send(writer, session, WELCOME_MESSAGE)
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                user_input = line.decode('utf-8', errors='replace').strip()
+                if user_input.lower() == 'exit':
+                    await self._send(writer, session, "AI: Goodbye!")
+                    break
+
+                extracted_info = None
+                if self.chatbot.needs_extraction(session, user_input):
+                    # Includes the wait for a batch slot when the message goes to the workers
+                    with self.chatbot.timings.stage('extract'):
+                        extracted_info = await self.pool.extract(user_input)
+                await self._send(writer, session, self.chatbot.respond(session, user_input, extracted_info))
+        except (ConnectionResetError, BrokenPipeError, ExtractionPoolClosed):
+            pass
+        finally:
+            self.active_sessions -= 1
+            del self._sessions[writer]
+            writer.close()
+
+    @staticmethod
+    async def _send(writer, session, reply):
+        writer.write((json.dumps({'session': session.session_id, 'reply': reply}) + "\n").encode('utf-8'))
+        await writer.drain()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=None, help="NER worker processes (default: CPU count, 0 = inline)")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--db", default=None, help="SQLite listings file (default: in-memory dummy data)")
+    parser.add_argument("--listings", default=None, help="JSONL/CSV listing feed to load at startup")
+    parser.add_argument("--model", default=DEFAULT_MODEL, help="spaCy model for NER (blank:en runs without one)")
+    args = parser.parse_args()
+
+    data_manager = None
+    if args.db:
+        from src.database.sqlite_data_manager import SQLiteDataManager
+        data_manager = SQLiteDataManager(args.db)
+    if args.listings:
+        from src.database.data_manager import DataManager
+        from src.database.listing_loader import load_listing_feed, print_progress
+        if data_manager is None:
+            data_manager = DataManager(listings=[])
+        load_listing_feed(args.listings, data_manager, progress=print_progress)
+
+    pool = ExtractionPool(workers=args.workers, batch_size=args.batch_size, model_name=args.model)
+    chatbot = Chatbot(warm_up=False, data_manager=data_manager, model_name=args.model)
+    server = ChatServer(chatbot, pool, args.host, args.port)
+
+    async def run():
+        host, port = await server.start()
+        print(f"Serving on {host}:{port} with {pool.workers} NER worker(s)", flush=True)
+
+        # Ctrl+C and SIGTERM both stop the server cleanly, shutting down the worker pool
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+        try:
+            await stop.wait()
+        finally:
+            await server.close()
+
+    asyncio.run(run())
+    print(f"Stopped after {server.total_sessions} sessions. NER: {pool.stats()}")
+    print(f"Match cache: {chatbot.match_cache.stats()}")
+    if chatbot.timings.enabled:
+        print(chatbot.timings.report())
+
+
+if __name__ == "__main__":
+    main()
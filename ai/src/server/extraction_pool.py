@@ -0,0 +1,153 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from src.nlp.ner_extractor import DEFAULT_MODEL, AdvancedNERExtractor, preload_model
+
+# The extractor of a worker process, created by _init_worker
+_worker_extractor = None
+
+
+def _init_worker(config_path, model_name):
+    global _worker_extractor
+    # The parent already tried its cache and the fast path, so workers go straight to spaCy
+    _worker_extractor = AdvancedNERExtractor(config_path=config_path, use_fast_path=False, model_name=model_name,
+                                             cache_size=0)
+
+
+def _extract_batch(texts):
+    return _worker_extractor.extract_many(texts)
+
+
+class ExtractionPoolClosed(RuntimeError):
+    """Raised to the sessions still waiting on the workers when the pool closes."""
+
+
+def _fail_pending(futures):
+    for future in futures:
+        if not future.done():
+            future.set_exception(ExtractionPoolClosed("The extraction pool was closed"))
+
+
+class ExtractionPool:
+    """
+    Runs NER for many concurrent sessions on a pool of worker processes.
+
+    Messages found in the extraction cache or understood by the regex fast path
+    are answered in the calling process. The rest are queued and shipped to the
+    workers in batches (up to batch_size messages, waiting at most max_delay
+    seconds for a batch to fill), where they go through extract_many; their
+    results are cached on the way back. With workers=0 everything runs inline,
+    which is handy for tests and single-core machines.
+    """
+
+    def __init__(self, config_path='config/ner_patterns.json', workers=None, batch_size=64, max_delay=0.002,
+                 preload=True, model_name=DEFAULT_MODEL):
+        self.extractor = AdvancedNERExtractor(config_path=config_path, model_name=model_name)
+        self.workers = os.cpu_count() if workers is None else workers
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+
+        self.batches = 0
+        self.batched_messages = 0
+        self.waiting = 0 # messages queued or in a batch, not answered yet
+
+        self.executor = None
+        if self.workers:
+            # Forked workers inherit a model loaded here copy-on-write instead of each loading their own
+            if preload and multiprocessing.get_start_method() == 'fork':
+                preload_model(self.extractor.model_name)
+            self.executor = ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                                initargs=(config_path, model_name))
+
+        self._queue = None
+        self._batcher = None
+        self._dispatches = set()
+
+    async def start(self):
+        if self.executor is not None and self._batcher is None:
+            self._queue = asyncio.Queue()
+            self._batcher = asyncio.create_task(self._collect_batches())
+
+    async def close(self):
+        """Stops the pool, failing the messages still queued or in flight, and shuts the workers down."""
+        if self._batcher is not None:
+            self._batcher.cancel()
+            for task in self._dispatches:
+                task.cancel()
+            await asyncio.gather(self._batcher, *self._dispatches, return_exceptions=True)
+            self._batcher = None
+            while not self._queue.empty():
+                _fail_pending([self._queue.get_nowait()[1]])
+        if self.executor is not None:
+            # Waiting for the workers to exit happens in a thread so the event loop keeps running
+            await asyncio.to_thread(self.executor.shutdown, cancel_futures=True)
+            self.executor = None
+
+    async def extract(self, text):
+        """Returns the extracted entities for one message."""
+        if self.executor is None:
+            return self.extractor.extract(text)
+
+        extracted_entities = self.extractor.extract_fast(text)
+        if extracted_entities is not None:
+            return extracted_entities
+
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((text, future))
+        self.waiting += 1
+        try:
+            return await future
+        finally:
+            self.waiting -= 1
+
+    def stats(self):
+        return {
+            'fast_path': self.extractor.fast_path.stats() if self.extractor.fast_path else None,
+            'cache': self.extractor.cache.stats() if self.extractor.cache else None,
+            'batches': self.batches,
+            'batched_messages': self.batched_messages,
+            'mean_batch_size': self.batched_messages / self.batches if self.batches else 0.0,
+            'waiting': self.waiting,
+        }
+
+    async def _collect_batches(self):
+        batch = []
+        try:
+            while True:
+                batch = [await self._queue.get()]
+                if self._queue.qsize() < self.batch_size - 1:
+                    # Give other sessions a moment to add to this batch
+                    await asyncio.sleep(self.max_delay)
+                while len(batch) < self.batch_size and not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+
+                # Dispatch without waiting so the next batch can form while this one runs
+                task = asyncio.create_task(self._dispatch(batch))
+                self._dispatches.add(task)
+                task.add_done_callback(self._dispatches.discard)
+                batch = []
+        finally:
+            # Closing: the batch being filled will never be dispatched
+            _fail_pending(future for _, future in batch)
+
+    async def _dispatch(self, batch):
+        self.batches += 1
+        self.batched_messages += len(batch)
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(self.executor, _extract_batch, [text for text, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        except BaseException:
+            # Cancelled by close(): the sessions waiting on this batch mustn't wait forever
+            _fail_pending(future for _, future in batch)
+            raise
+        for (text, future), result in zip(batch, results):
+            self.extractor.remember(text, result)
+            if not future.done():
+                future.set_result(result)
@@ -0,0 +1,38 @@
+import os
+
+import pytest
+import spacy
+
+from src.nlp import ner_extractor
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), '..', 'config', 'ner_patterns.json')
+
+# (user_request, role) pairs covering the dummy listings, shared by the matcher tests
+REQUESTS = [
+    ({'product': 'apples', 'quantity': 100.0, 'unit': 'kg', 'price': 10.0, 'currency': 'rupees'}, 'buyer'),
+    ({'product': 'Apples', 'quantity': None, 'unit': None, 'price': 10.0, 'currency': 'rupees'}, 'buyer'),
+    ({'product': 'rice', 'quantity': 50.0, 'unit': 'kg', 'price': 50.0, 'currency': 'rupees'}, 'seller'),
+    ({'product': 'sugar', 'quantity': None, 'unit': None, 'price': 40.0, 'currency': 'rupees'}, 'seller'),
+    ({'product': 'tea', 'quantity': 500.0, 'unit': 'gram', 'price': None, 'currency': None}, 'buyer'),
+    ({'product': 'mangoes', 'quantity': 1.0, 'unit': 'kg', 'price': 1.0, 'currency': 'rupees'}, 'buyer'),
+]
+
+
+def summary(matches):
+    """Reduces matches to (listing_id, score) pairs for comparing matcher results."""
+    return [(m['listing']['listing_id'], m['score']) for m in matches]
+
+
+@pytest.fixture(autouse=True)
+def blank_model(monkeypatch):
+    """
+    Serves a blank English pipeline in place of the trained spaCy model.
+
+    The trained model isn't needed to exercise the rule-based phases. Returns the
+    names of the models loaded during the test. Worker processes don't see this
+    patch; pass model_name='blank:en' to an ExtractionPool instead.
+    """
+    loads = []
+    monkeypatch.setattr(ner_extractor, "_models", {})
+    monkeypatch.setattr(ner_extractor, "_load_model", lambda name: loads.append(name) or spacy.blank("en"))
+    return loads
@@ -0,0 +1,85 @@
+import asyncio
+import json
+
+import pytest
+
+from src.main import WELCOME_MESSAGE, ChatSession, Chatbot
+from src.server.chat_server import ChatServer
+from src.server.extraction_pool import ExtractionPool
+
+from tests.conftest import CONFIG_PATH
+
+
+def test_sessions_keep_separate_state():
+    chatbot = Chatbot(config_path=CONFIG_PATH, warm_up=False)
+    alice, bob = ChatSession(1), ChatSession(2)
+
+    assert "What do you wish to buy" in chatbot.respond(alice, "buyer")
+    assert "What do you wish to sell" in chatbot.respond(bob, "seller")
+    assert chatbot.needs_extraction(alice, "100 kg apples for 10 rupees per kg")
+    assert not chatbot.needs_extraction(alice, "okay")
+
+    reply = chatbot.respond(alice, "100 kg apples for 10 rupees per kg")
+    assert "1. Seller ID: seller_A" in reply
+    assert alice.user_role is None and bob.user_role == "seller"
+    assert "Buyer ID: buyer_X" in chatbot.respond(bob, "50 kg rice at 50 rupees per kg")
+
+
+async def _converse(port, messages):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    replies = [json.loads(await reader.readline())]
+    for message in messages:
+        writer.write((message + "\n").encode())
+        await writer.drain()
+        replies.append(json.loads(await reader.readline()))
+    writer.close()
+    return replies
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_server_handles_concurrent_sessions(workers):
+    async def scenario():
+        # Workers load blank:en themselves, whether forked or spawned
+        pool = ExtractionPool(config_path=CONFIG_PATH, workers=workers, max_delay=0.01, preload=False,
+                              model_name='blank:en')
+        server = ChatServer(Chatbot(config_path=CONFIG_PATH, warm_up=False), pool, port=0)
+        _, port = await server.start()
+        try:
+            return await asyncio.gather(*(
+                _converse(port, ["buyer", "I need some apples", "exit"]) for _ in range(20)
+            )), pool.stats()
+        finally:
+            await server.close()
+
+    conversations, stats = asyncio.run(scenario())
+    assert len({c[0]['session'] for c in conversations}) == 20
+    for replies in conversations:
+        assert replies[0]['reply'] == WELCOME_MESSAGE
+        assert "detecting your request for apples" in replies[2]['reply']
+        assert replies[3]['reply'] == "AI: Goodbye!"
+    if workers:
+        # The messages all need spaCy, so they were shipped to the workers in batches
+        assert stats['batched_messages'] == 20
+        assert stats['batches'] < 20
+
+
+def test_close_ends_open_sessions_and_waiting_extractions():
+    async def scenario():
+        # Batches wait a minute to fill, so the message is still waiting on NER when the server closes
+        pool = ExtractionPool(config_path=CONFIG_PATH, workers=1, max_delay=60, preload=False, model_name='blank:en')
+        server = ChatServer(Chatbot(config_path=CONFIG_PATH, warm_up=False), pool, port=0)
+        _, port = await server.start()
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        await reader.readline()
+        writer.write(b"buyer\nI need some apples\n")
+        await reader.readline()
+        while not pool.stats()['waiting']:
+            await asyncio.sleep(0.01)
+
+        await asyncio.wait_for(server.close(), timeout=10)
+        ending = await reader.readline()
+        writer.close()
+        await asyncio.sleep(0)
+        return ending, server.active_sessions, pool.executor
+
+    assert asyncio.run(scenario()) == (b"", 0, None)
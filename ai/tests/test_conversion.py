@@ -0,0 +1,80 @@
+import pytest
+
+from src.database.conversion import ConversionTable, default_conversions
+from src.database.data_manager import DataManager
+from src.matching.matcher import find_best_matches, score_listing
+
+
+@pytest.fixture
+def conversions():
+    return default_conversions()
+
+
+def test_units_normalize_to_base(conversions):
+    assert conversions.normalize(500.0, "gram", None, None).quantity == pytest.approx(0.5)
+    assert conversions.normalize(2.0, "lb", None, None).quantity == pytest.approx(0.90718474)
+    assert conversions.normalize(2.0, "dozen", None, None).quantity == 24.0
+    assert conversions.normalize(1.0, "gram", None, None).dimension == "mass"
+    # Units without a factor only match themselves
+    assert conversions.normalize(3.0, "bag", None, None)[:2] == (3.0, "bag")
+
+
+def test_prices_normalize_to_base_currency_per_base_unit(conversions):
+    normalized = conversions.normalize(1.0, "gram", 0.05, "dollars")
+    assert normalized.currency == "rupees"
+    assert normalized.unit_price == pytest.approx(0.05 * 83.0)
+    assert normalized.base_price == pytest.approx(0.05 * 83.0 * 1000)
+    # No known rate: the currency is kept as-is
+    assert conversions.normalize(1.0, "kg", 10.0, "yen").currency == "yen"
+
+
+def test_pluggable_rates():
+    table = ConversionTable(units={"kg": {"dimension": "mass", "factor": 1.0}},
+                            exchange_rates={"rupees": 1.0, "dollars": 100.0}, base_currency="rupees")
+    listing = {"quantity": 1.0, "unit": "kg", "price_per_unit": 0.1, "currency": "dollars"}
+    request_info = {"quantity": 1.0, "unit": "kg", "price": 10.0, "currency": "rupees"}
+    assert score_listing(listing, request_info, "buyer", table) == 10
+
+
+def test_cross_unit_and_currency_listings_match():
+    dm = DataManager(listings=[
+        {"listing_id": 1, "user_id": "s1", "type": "selling", "product_name": "tea",
+         "quantity": 500.0, "unit": "gram", "price_per_unit": 0.02, "currency": "rupees"},
+        {"listing_id": 2, "user_id": "s2", "type": "selling", "product_name": "tea",
+         "quantity": 1.1, "unit": "lb", "price_per_unit": 0.2, "currency": "dollars"},
+        {"listing_id": 3, "user_id": "s3", "type": "selling", "product_name": "tea",
+         "quantity": 0.5, "unit": "liter", "price_per_unit": 20.0, "currency": "rupees"},
+    ])
+    request_info = {'product': 'tea', 'quantity': 0.5, 'unit': 'kg', 'price': 40.0, 'currency': 'rupees'}
+    matches = find_best_matches(request_info, dm, 'buyer')
+    # 500 gram is exactly 0.5 kg at 20 rupees/kg; 1.1 lb is ~0.499 kg at ~36.6 rupees/kg;
+    # the liter listing only earns price points (the request's price is taken per the listing's unit)
+    assert [(m['listing']['listing_id'], m['score']) for m in matches] == [(1, 10), (2, 9), (3, 5)]
+
+
+def test_index_orders_by_normalized_price():
+    dm = DataManager(listings=[
+        {"listing_id": 1, "user_id": "s1", "type": "selling", "product_name": "rice",
+         "quantity": 1.0, "unit": "kg", "price_per_unit": 50.0, "currency": "rupees"},
+        {"listing_id": 2, "user_id": "s2", "type": "selling", "product_name": "rice",
+         "quantity": 1.0, "unit": "kg", "price_per_unit": 0.5, "currency": "dollars"},
+    ])
+    assert [l['listing_id'] for l in dm.get_candidates("selling", "rice")] == [2, 1]
+    dm.update_listing(2, {"price_per_unit": 1.0})
+    assert [l['listing_id'] for l in dm.get_candidates("selling", "rice")] == [1, 2]
+
+
+def test_alias_spelled_listings_convert(conversions):
+    grams, kg = conversions.normalize(1000.0, "grams", 0.05, "rs"), conversions.normalize(1.0, "kg", 50.0, "rupees")
+    assert (grams.quantity, grams.dimension, grams.base_price, grams.currency) == \
+        (kg.quantity, kg.dimension, pytest.approx(kg.base_price), kg.currency)
+    assert conversions.normalize(2.0, "Liters", 1.0, "INR").dimension == "volume"
+
+    dm = DataManager(listings=[
+        {"listing_id": 1, "user_id": "s1", "type": "selling", "product_name": "rice",
+         "quantity": 1000.0, "unit": "grams", "price_per_unit": 0.05, "currency": "rs"},
+        {"listing_id": 2, "user_id": "s2", "type": "selling", "product_name": "rice",
+         "quantity": 1.0, "unit": "kgs", "price_per_unit": 50.0, "currency": "inr"},
+    ])
+    request_info = {"product": "rice", "quantity": 1.0, "unit": "kg", "price": 50.0, "currency": "rupees"}
+    assert [m['score'] for m in find_best_matches(request_info, dm, "buyer")] == [10, 10]
@@ -0,0 +1,38 @@
+from src.database.data_manager import DataManager
+from src.database.dummy_data import database_listings
+
+
+def test_loads_dummy_data_by_default():
+    dm = DataManager()
+    assert len(dm.get_all_listings()) == len(database_listings)
+
+
+def test_candidates_are_bucketed_and_sorted_by_price():
+    dm = DataManager()
+    candidates = dm.get_candidates("selling", "Apples")
+    assert [l['listing_id'] for l in candidates] == [1, 3, 2]
+    assert dm.get_candidates("buying", "apples")[0]['listing_id'] == 16
+    assert dm.get_candidates("selling", "mangoes") == []
+
+
+def test_price_band_is_inclusive():
+    dm = DataManager()
+    band = dm.get_candidates("selling", "apples", min_price=9.0, max_price=10.0)
+    assert [l['listing_id'] for l in band] == [1, 3]
+
+
+def test_add_update_delete_maintain_index():
+    dm = DataManager(listings=[])
+    listing = dm.add_listing({"user_id": "s1", "type": "selling", "product_name": "Rice",
+                              "quantity": 10.0, "unit": "kg", "price_per_unit": 40.0, "currency": "rupees"})
+    assert listing['listing_id'] == 1
+    assert dm.get_candidates("selling", "rice") == [listing]
+
+    dm.update_listing(1, {"product_name": "wheat", "price_per_unit": 20.0})
+    assert dm.get_candidates("selling", "rice") == []
+    assert dm.get_candidates("selling", "wheat", max_price=25.0) == [listing]
+
+    assert dm.delete_listing(1) is listing
+    assert dm.get_candidates("selling", "wheat") == []
+    assert dm.delete_listing(1) is None
+    assert dm.update_listing(1, {"quantity": 1.0}) is None
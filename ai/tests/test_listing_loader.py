@@ -0,0 +1,105 @@
+import csv
+import json
+import os
+
+import pytest
+
+from src.database.data_manager import DataManager
+from src.database.dummy_data import database_listings
+from src.database.listing import LISTING_FIELDS, Listing
+from src.database.listing_loader import load_listing_feed, read_listing_feed
+from src.database.sqlite_data_manager import SQLiteDataManager
+from src.main import ChatSession, Chatbot
+from src.matching.matcher import find_best_matches
+
+from tests.conftest import CONFIG_PATH, REQUESTS, summary
+
+
+def _write_jsonl(path, listings):
+    with open(path, 'w') as feed:
+        for listing in listings:
+            feed.write(json.dumps(listing) + "\n")
+        feed.write("\n") # Blank lines are skipped
+    return str(path)
+
+
+def _write_csv(path, listings):
+    with open(path, 'w', newline='') as feed:
+        writer = csv.DictWriter(feed, fieldnames=LISTING_FIELDS)
+        writer.writeheader()
+        writer.writerows(listings)
+    return str(path)
+
+
+def test_listing_record_behaves_like_a_listing_dict():
+    data = database_listings[0]
+    listing = Listing.from_dict(dict(data, extra="ignored"))
+    assert listing == data and listing.to_dict() == data
+    assert listing['product_name'] == 'apples' and listing.get('missing', 1) == 1
+    with pytest.raises(KeyError):
+        listing['missing']
+
+    other = Listing.from_dict(database_listings[1])
+    assert listing.product_name is other.product_name # Interned, not just equal
+    assert Listing(product_name="".join(["app", "les"])).product_name is listing.product_name
+
+    copy = listing.copy()
+    copy.update({'price_per_unit': 1.0})
+    assert listing['price_per_unit'] == 9.0 and copy != listing
+
+
+def test_updating_a_record_ignores_unknown_fields():
+    data_manager = DataManager(listings=[Listing.from_dict(data) for data in database_listings])
+    updated = data_manager.update_listing(1, {'price_per_unit': 1.0, 'notes': "x"})
+
+    assert updated.price_per_unit == 1.0 and "notes" not in updated
+    assert [listing['listing_id'] for listing in data_manager.get_candidates('selling', 'apples')] == [1, 3, 2]
+
+@pytest.mark.parametrize("write", [_write_jsonl, _write_csv])
+def test_feeds_round_trip(tmp_path, write):
+    path = write(tmp_path / ("feed.jsonl" if write is _write_jsonl else "feed.csv"), database_listings)
+    records = list(read_listing_feed(path))
+    assert all(isinstance(record, Listing) for record in records)
+    assert records == database_listings
+
+
+def test_csv_missing_values_become_none(tmp_path):
+    path = _write_csv(tmp_path / "feed.csv", [{"user_id": "s1", "type": "selling", "product_name": "rice"}])
+    record = next(read_listing_feed(path))
+    assert record.listing_id is None and record.quantity is None and record.price_per_unit is None
+
+
+def test_bad_feeds_are_reported(tmp_path):
+    with pytest.raises(ValueError, match="Unknown listing feed format"):
+        list(read_listing_feed(str(tmp_path / "feed.txt")))
+
+    path = tmp_path / "feed.jsonl"
+    path.write_text('{"listing_id": 1}\n{not json\n')
+    with pytest.raises(ValueError, match="line 2"):
+        list(read_listing_feed(str(path)))
+
+
+@pytest.mark.parametrize("make_database", [lambda: DataManager(listings=[]), lambda: SQLiteDataManager(listings=[])])
+def test_streamed_feed_matches_like_dicts(tmp_path, make_database):
+    path = _write_jsonl(tmp_path / "feed.jsonl", database_listings)
+    database, progress = make_database(), []
+    count = load_listing_feed(path, database, chunk_size=4, progress=lambda *args: progress.append(args))
+
+    assert count == len(database_listings)
+    assert [loaded for loaded, _, _ in progress] == [4, 8, 12, 16, 16]
+    assert progress[-1][1] == progress[-1][2] == os.path.getsize(path)
+
+    reference = DataManager()
+    for request_info, role in REQUESTS:
+        assert summary(find_best_matches(request_info, database, role)) == \
+            summary(find_best_matches(request_info, reference, role))
+
+
+def test_chatbot_formats_listing_records(tmp_path):
+    data_manager = DataManager(listings=[])
+    load_listing_feed(_write_csv(tmp_path / "feed.csv", database_listings), data_manager)
+
+    chatbot, session = Chatbot(config_path=CONFIG_PATH, warm_up=False, data_manager=data_manager), ChatSession()
+    chatbot.respond(session, "buyer")
+    reply = chatbot.respond(session, "100 kg apples for 10 rupees per kg")
+    assert "1. Seller ID: seller_A is selling 100 kg of apples at 9.00 rupees per kg." in reply
@@ -0,0 +1,75 @@
+import pytest
+
+from src.cache.lru_cache import LRUCache
+from src.database.data_manager import DataManager
+from src.database.sqlite_data_manager import SQLiteDataManager
+from src.matching.match_cache import MatchCache
+from src.matching.matcher import find_best_matches
+
+from tests.conftest import REQUESTS, summary
+
+APPLES = {'product': 'apples', 'quantity': 100.0, 'unit': 'kg', 'price': 10.0, 'currency': 'rupees'}
+RICE = {'product': 'rice', 'quantity': 50.0, 'unit': 'kg', 'price': 50.0, 'currency': 'rupees'}
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1 # 'b' is now the least recently used
+    cache.put('c', 3)
+
+    assert 'b' not in cache and 'a' in cache and 'c' in cache
+    assert cache.get('b') is None
+    assert cache.stats() == {'hits': 1, 'misses': 1, 'hit_rate': 0.5, 'evictions': 1, 'size': 2, 'maxsize': 2}
+
+
+def test_lru_with_zero_size_stores_nothing():
+    cache = LRUCache(maxsize=0)
+    cache.put('a', 1)
+    assert len(cache) == 0 and cache.get('a') is None
+
+
+@pytest.mark.parametrize("make_database", [DataManager, SQLiteDataManager])
+def test_cached_results_match_uncached(make_database):
+    database = make_database()
+    cache = MatchCache(database)
+    for _ in range(2):
+        for request_info, role in REQUESTS:
+            assert summary(cache.find_best_matches(request_info, role)) == \
+                summary(find_best_matches(request_info, database, role))
+
+    cacheable = sum(1 for request_info, _ in REQUESTS if request_info.get('product'))
+    assert cache.stats()['hits'] >= cacheable
+
+
+@pytest.mark.parametrize("make_database", [DataManager, SQLiteDataManager])
+def test_listing_changes_invalidate_only_their_product(make_database):
+    database = make_database()
+    cache = MatchCache(database)
+    cache.find_best_matches(APPLES, "buyer")
+    cache.find_best_matches(RICE, "buyer")
+    assert cache.stats()['misses'] == 2
+
+    listing = database.add_listing({"user_id": "seller_new", "type": "selling", "product_name": "Apples",
+                                    "quantity": 100.0, "unit": "kg", "price_per_unit": 8.0, "currency": "rupees"})
+    assert cache.find_best_matches(APPLES, "buyer")[0]['listing']['user_id'] == "seller_new"
+    cache.find_best_matches(RICE, "buyer")
+    assert cache.stats()['misses'] == 3 and cache.stats()['hits'] == 1
+
+    # Moving the listing to another product invalidates both buckets
+    database.update_listing(listing['listing_id'], {"product_name": "rice"})
+    assert all(m['listing']['user_id'] != "seller_new" for m in cache.find_best_matches(APPLES, "buyer"))
+    assert summary(cache.find_best_matches(RICE, "buyer")) == summary(find_best_matches(RICE, database, "buyer"))
+    assert cache.stats()['misses'] == 5
+
+    database.delete_listing(listing['listing_id'])
+    assert summary(cache.find_best_matches(RICE, "buyer")) == summary(find_best_matches(RICE, database, "buyer"))
+    assert cache.stats()['misses'] == 6
+
+
+def test_plain_lists_are_not_cached():
+    listings = DataManager().get_all_listings()
+    cache = MatchCache(listings)
+    assert summary(cache.find_best_matches(APPLES, "buyer")) == summary(find_best_matches(APPLES, listings, "buyer"))
+    assert cache.stats()['size'] == 0
@@ -0,0 +1,168 @@
+import pytest
+
+from src.database.data_manager import DataManager
+from src.database.dummy_data import database_listings
+from src.database.sqlite_data_manager import SQLiteDataManager
+from src.matching import matcher
+from src.matching.matcher import cross_order_book, find_best_matches, find_best_matches_batch
+
+from tests.conftest import REQUESTS, summary
+
+
+@pytest.mark.parametrize("request_info, role", REQUESTS)
+def test_indexed_lookup_matches_full_scan(request_info, role):
+    assert summary(find_best_matches(request_info, DataManager(), role)) == \
+        summary(find_best_matches(request_info, database_listings, role))
+
+
+def test_buyer_gets_cheapest_perfect_matches_first():
+    request_info = {'product': 'apples', 'quantity': 100.0, 'unit': 'kg', 'price': 10.0, 'currency': 'rupees'}
+    matches = find_best_matches(request_info, DataManager(), 'buyer')
+    assert [m['listing']['listing_id'] for m in matches] == [1, 3, 2]
+    assert matches[0]['score'] == 10
+
+
+def test_no_product_returns_nothing():
+    assert find_best_matches({'product': None}, DataManager(), 'buyer') == []
+
+
+@pytest.mark.parametrize("database_factory", [lambda listings: listings, lambda listings: DataManager(listings=listings)])
+def test_product_names_match_regardless_of_case_and_whitespace(database_factory):
+    database = database_factory([
+        {"listing_id": 1, "user_id": "u1", "type": "selling", "product_name": "rice ", "quantity": 50.0,
+         "unit": "kg", "price_per_unit": 40.0, "currency": "rupees"},
+        {"listing_id": 2, "user_id": "u2", "type": "selling", "product_name": " Rice", "quantity": 50.0,
+         "unit": "kg", "price_per_unit": 45.0, "currency": "rupees"},
+    ])
+    request_info = {'product': 'RICE ', 'quantity': 50.0, 'unit': 'kg', 'price': 50.0, 'currency': 'rupees'}
+    assert [m['listing']['listing_id'] for m in find_best_matches(request_info, database, 'buyer')] == [1, 2]
+    assert [[m['listing']['listing_id'] for m in matches]
+            for matches in find_best_matches_batch([(request_info, 'buyer')], database)] == [[1, 2]]
+
+
+def _synthetic_listings(n=2000):
+    import random
+    rng = random.Random(7)
+    return [{"listing_id": i, "user_id": f"u{i}", "type": rng.choice(["selling", "buying"]),
+             "product_name": "apples", "quantity": float(rng.choice([50, 95, 100, 120, 300])), "unit": "kg",
+             "price_per_unit": float(rng.randint(5, 20)), "currency": "rupees"} for i in range(1, n + 1)]
+
+
+@pytest.mark.parametrize("role", ["buyer", "seller"])
+@pytest.mark.parametrize("k", [1, 3, 10, 50])
+def test_top_k_with_early_termination_matches_full_sort(role, k):
+    listings = _synthetic_listings()
+    request_info = {'product': 'apples', 'quantity': 100.0, 'unit': 'kg', 'price': 10.0, 'currency': 'rupees'}
+    expected = find_best_matches(request_info, listings, role, k=len(listings))[:k]
+    got = find_best_matches(request_info, DataManager(listings=listings), role, k=k)
+    assert len(got) == len(expected) == k
+    assert [(m['score'], m['listing']['price_per_unit']) for m in got] == \
+        [(m['score'], m['listing']['price_per_unit']) for m in expected]
+
+
+def _mixed_unit_listings(n=3000):
+    import random
+    rng = random.Random(11)
+    units = ["kg", "gram", "lb", "liter", "dozen", None]
+    return [{"listing_id": i, "user_id": f"u{i}", "type": rng.choice(["selling", "buying"]),
+             "product_name": "tea", "quantity": rng.choice([None, 0.5, 2.0, 100.0, 750.0, 1000.0]),
+             "unit": rng.choice(units), "price_per_unit": rng.choice([None, 0.2, 1.0, 5.0, 40.0, 400.0]),
+             "currency": rng.choice(["rupees", "dollars", None])} for i in range(1, n + 1)]
+
+
+@pytest.mark.parametrize("role", ["buyer", "seller"])
+@pytest.mark.parametrize("request_info", [
+    {'product': 'tea', 'quantity': 1000.0, 'unit': 'gram', 'price': 1.0, 'currency': 'dollars'},
+    {'product': 'tea', 'quantity': 2.0, 'unit': 'dozen', 'price': 40.0, 'currency': 'rupees'},
+    {'product': 'tea', 'quantity': None, 'unit': None, 'price': 5.0, 'currency': 'rupees'},
+    {'product': 'tea', 'quantity': 750.0, 'unit': None, 'price': None, 'currency': None},
+])
+def test_score_bound_cutoff_matches_full_scan_across_units(request_info, role):
+    listings = _mixed_unit_listings()
+    expected = find_best_matches(request_info, listings, role, k=len(listings))[:5]
+    got = find_best_matches(request_info, DataManager(listings=listings), role, k=5)
+    assert [m['score'] for m in got] == [m['score'] for m in expected]
+
+
+def test_cutoff_compares_other_units_per_their_own_unit():
+    # Walking buyers from the highest normalized price, the dozen listing comes last
+    # (10 rupees a piece) but its price per dozen beats the seller's price per kg
+    listings = [
+        {"listing_id": 1, "user_id": "u1", "type": "buying", "product_name": "eggs", "quantity": 1.0,
+         "unit": "kg", "price_per_unit": 50.0, "currency": "rupees"},
+        {"listing_id": 2, "user_id": "u2", "type": "buying", "product_name": "eggs", "quantity": 1.0,
+         "unit": "dozen", "price_per_unit": 120.0, "currency": "rupees"},
+    ]
+    request_info = {'product': 'eggs', 'quantity': None, 'unit': 'kg', 'price': 100.0, 'currency': 'rupees'}
+    expected = find_best_matches(request_info, listings, 'seller', k=1)
+    assert summary(find_best_matches(request_info, DataManager(listings=listings), 'seller', k=1)) == \
+        summary(expected) == [(2, 5)]
+
+
+def test_walk_stops_once_nothing_can_score(monkeypatch):
+    # No listing is near the requested quantity and there's no price, so the bucket
+    # profile shows nothing can score and the walk ends before scoring anything
+    listings = [{"listing_id": i, "user_id": "u", "type": "selling", "product_name": "tea", "quantity": 5.0,
+                 "unit": "kg", "price_per_unit": float(i), "currency": "rupees"} for i in range(1, 1001)]
+    data_manager = DataManager(listings=listings)
+    assert data_manager.bucket_profile('selling', 'Tea') == {('mass', 1.0): [5.0, 5.0]}
+
+    scored = []
+    score_listing = matcher.score_listing
+    monkeypatch.setattr(matcher, "score_listing", lambda *args: scored.append(args) or score_listing(*args))
+    request_info = {'product': 'tea', 'quantity': 1000.0, 'unit': 'kg', 'price': None, 'currency': None}
+    assert find_best_matches(request_info, data_manager, 'buyer') == []
+    assert scored == []
+
+
+def test_k_limits_result_count():
+    request_info = {'product': 'apples', 'quantity': 100.0, 'unit': 'kg', 'price': 10.0, 'currency': 'rupees'}
+    assert len(find_best_matches(request_info, DataManager(), 'buyer', k=1)) == 1
+    assert find_best_matches(request_info, DataManager(), 'buyer', k=0) == []
+
+
+@pytest.mark.parametrize("database_factory", [DataManager, lambda: database_listings])
+def test_batch_matches_individual_calls(database_factory):
+    database = database_factory()
+    batch = [(request_info, role) for request_info, role in REQUESTS] * 2 + [({'product': None}, 'buyer')]
+    results = find_best_matches_batch(batch, database)
+    assert len(results) == len(batch)
+    for (request_info, role), result in zip(batch, results):
+        assert summary(result) == summary(find_best_matches(request_info, database, role))
+
+
+@pytest.mark.parametrize("database_factory", [lambda listings: DataManager(listings=listings),
+                                              lambda listings: SQLiteDataManager(listings=listings)])
+def test_batch_walks_no_further_than_individual_calls(database_factory, monkeypatch):
+    database = database_factory(_synthetic_listings())
+    batch = [({'product': 'apples', 'quantity': quantity, 'unit': 'kg', 'price': price, 'currency': 'rupees'}, role)
+             for quantity in (None, 100.0) for price in (None, 10.0) for role in ("buyer", "seller")] * 3
+    walked = []
+    iter_candidates = database.iter_candidates
+
+    def counting_iter_candidates(*args, **kwargs):
+        for listing in iter_candidates(*args, **kwargs):
+            walked.append(listing)
+            yield listing
+
+    monkeypatch.setattr(database, "iter_candidates", counting_iter_candidates)
+    expected = [find_best_matches(request_info, database, role) for request_info, role in batch]
+    individual, walked[:] = len(walked), []
+    assert [summary(result) for result in find_best_matches_batch(batch, database)] == \
+        [summary(result) for result in expected]
+    # The batch still stops early: it fetches each listing at most once, never the whole bucket
+    assert len(walked) <= individual < len(_synthetic_listings())
+
+
+def test_cross_order_book_pairs_every_buying_listing():
+    dm = DataManager()
+    crossed = cross_order_book(dm)
+    buying = [l for l in dm.get_all_listings() if l['type'] == 'buying']
+    assert [c['listing'] for c in crossed] == buying
+
+    apples = next(c for c in crossed if c['listing']['listing_id'] == 16)
+    # buyer_BB wants 80 kg at 9.5: seller_A (90 kg at 9.0) is the best counterpart
+    assert apples['matches'][0]['listing']['listing_id'] == 1
+    assert all(m['listing']['type'] == 'selling' for c in crossed for m in c['matches'])
+    from_list = cross_order_book(database_listings)
+    assert [summary(c['matches']) for c in from_list] == [summary(c['matches']) for c in crossed]
@@ -0,0 +1,117 @@
+import pytest
+
+from src.nlp import ner_extractor
+from src.nlp.ner_extractor import AdvancedNERExtractor
+
+from tests.conftest import CONFIG_PATH
+
+
+MESSAGES = [
+    "100 kg apples for 10 rupees per kg",
+    "50 kg rice at 50 rupees per kg",
+    "I need 2 liters of milk",
+    "sugar",
+    "hello there",
+    "",
+]
+
+
+@pytest.fixture
+def extractor():
+    return AdvancedNERExtractor(config_path=CONFIG_PATH)
+
+
+def test_extract_rule_based(extractor):
+    result = extractor.extract("100 kg apples for 10 rupees per kg")
+    assert result['product'] == 'apples'
+    assert result['quantity'] == 100.0
+
+
+@pytest.mark.parametrize("batch_size", [1, 2, 256])
+def test_extract_many_matches_extract(extractor, batch_size):
+    assert extractor.extract_many(MESSAGES, batch_size=batch_size) == [extractor.extract(m) for m in MESSAGES]
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("100 kg apples for 10 rupees per kg",
+     {'product': 'apples', 'quantity': 100.0, 'unit': 'kg', 'price': 10.0, 'currency': 'rupees'}),
+    ("$5 for 10 lbs of coffee",
+     {'product': 'coffee', 'quantity': 10.0, 'unit': 'lb', 'price': 5.0, 'currency': 'dollars'}),
+    ("I need 12.5 liters milk for 30 qatar riyals",
+     {'product': 'milk', 'quantity': 12.5, 'unit': 'liter', 'price': 30.0, 'currency': 'qatar riyals'}),
+    ("Rs. 1,500 for 1,200 kgs Sugar",
+     {'product': 'Sugar', 'quantity': 1200.0, 'unit': 'kg', 'price': 1500.0, 'currency': 'rupees'}),
+    ("20 kilograms rice for ₹45",
+     {'product': 'rice', 'quantity': 20.0, 'unit': 'kg', 'price': 45.0, 'currency': 'rupees'}),
+])
+def test_fast_path_hits(extractor, text, expected):
+    assert extractor.extract(text) == expected
+    assert extractor.fast_path.stats() == {'hits': 1, 'misses': 0, 'hit_rate': 1.0}
+
+
+@pytest.mark.parametrize("text", [
+    "apples",                                      # no quantity or price
+    "10 pounds tea for 5 pounds",                  # ambiguous unit/currency
+    "2 bags of 50 kg rice for 10 rs",              # two quantities
+    "100 kg apples and rice for 10 rupees",        # two products
+    "100 kg apples for 10 rupees, delivery in 3",  # unattributed number
+    "100 kg apples for 10 rupees, budget 20k",     # number attached to letters
+    "100 kg apples for 10 rupees within 2days",
+])
+def test_fast_path_falls_back_to_spacy(extractor, text):
+    assert extractor.fast_path.extract(text) is None
+    assert extractor.fast_path.misses == 1
+
+
+def test_extract_many_mixes_fast_path_and_spacy(extractor):
+    extractor.extract_many(MESSAGES)
+    assert extractor.fast_path.hits == 2
+    assert extractor.fast_path.misses == len(MESSAGES) - 2
+
+
+def test_fast_path_can_be_disabled():
+    extractor = AdvancedNERExtractor(config_path=CONFIG_PATH, use_fast_path=False)
+    assert extractor.fast_path is None
+    assert extractor.extract("100 kg apples for 10 rupees per kg")['product'] == 'apples'
+
+
+def test_model_is_loaded_lazily_and_shared(blank_model):
+    first = AdvancedNERExtractor(config_path=CONFIG_PATH)
+    second = AdvancedNERExtractor(config_path=CONFIG_PATH)
+    assert blank_model == []
+
+    # Fast-path hits never need the model
+    first.extract("100 kg apples for 10 rupees per kg")
+    assert blank_model == []
+
+    first.extract("apples")
+    second.extract("rice")
+    assert blank_model == ["en_core_web_sm"]
+    assert first.nlp is second.nlp
+
+
+def test_warm_up_loads_in_background(blank_model):
+    extractor = AdvancedNERExtractor(config_path=CONFIG_PATH)
+    extractor.warm_up().join()
+    assert blank_model == ["en_core_web_sm"]
+    assert extractor.nlp is ner_extractor.get_model()
+    assert extractor.warm_up() is None
+
+
+def test_results_are_cached_on_normalized_text(extractor):
+    first = extractor.extract("I need some apples")
+    assert extractor.extract("  i NEED some   apples ") == first
+    assert extractor.cache.stats()['hits'] == 1
+    assert extractor.fast_path.misses == 1
+
+    # Callers get copies, so changing a result doesn't change the cache
+    first['product'] = 'rice'
+    assert extractor.extract("I need some apples")['product'] == 'apples'
+
+
+def test_cache_can_be_disabled():
+    extractor = AdvancedNERExtractor(config_path=CONFIG_PATH, cache_size=0)
+    assert extractor.cache is None
+    extractor.extract("I need some apples")
+    extractor.extract("I need some apples")
+    assert extractor.fast_path.misses == 2
@@ -0,0 +1,51 @@
+import json
+
+import pytest
+
+from src.nlp.normalization import EntityNormalizer, parse_number
+
+from tests.conftest import CONFIG_PATH
+
+
+@pytest.fixture(scope="module")
+def normalizer():
+    with open(CONFIG_PATH, 'r') as f:
+        return EntityNormalizer(json.load(f)['patterns'])
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("100 kg", 100.0), ("12.5 liters", 12.5), ("1,200 kg", 1200.0), ("1,234,567.25", 1234567.25),
+    ("1,20,000", 120000.0), ("Rs 1,00,00,000.50", 10000000.5),
+    ("Rs. 40", 40.0), ("no numbers", None),
+])
+def test_parse_number(text, expected):
+    assert parse_number(text) == expected
+
+
+@pytest.mark.parametrize("token, expected", [
+    ("kgs", "kg"), ("Kilograms", "kg"), ("pounds", "lb"), ("g", "gram"), ("ml", "milliliter"),
+    ("dozen", "dozen"), ("units", "units"), ("crates", "crate"), ("furlongs", "furlongs"),
+])
+def test_unit_table(normalizer, token, expected):
+    assert normalizer.unit(token) == expected
+
+
+@pytest.mark.parametrize("token, expected", [
+    ("rs", "rupees"), ("Rs.", "rupees"), ("₹", "rupees"), ("INR", "rupees"), ("$", "dollars"),
+    ("€", "eur"), ("£", "pounds"), ("pounds", "pounds"), ("qar", "qatar riyals"), ("aed", "aed"),
+])
+def test_currency_table(normalizer, token, expected):
+    assert normalizer.currency(token) == expected
+
+
+@pytest.mark.parametrize("text, unit, currency", [
+    ("1,200 kg", "kg", None),
+    ("500 grams", "gram", None),
+    ("10 bags", "bag", None),
+    ("30 qatar riyals", None, "qatar riyals"),
+    ("₹250", None, "rupees"),
+    ("Rs. 40", None, "rupees"),
+])
+def test_find_tokens_in_text(normalizer, text, unit, currency):
+    assert normalizer.find_unit(text) == unit
+    assert normalizer.find_currency(text) == currency
@@ -0,0 +1,78 @@
+import pytest
+
+from src.database.data_manager import DataManager
+from src.database.dummy_data import database_listings
+from src.database.sqlite_data_manager import SQLiteDataManager
+from src.matching.matcher import cross_order_book, find_best_matches
+
+from tests.conftest import REQUESTS, summary
+
+
+def _ids(listings):
+    return [l['listing_id'] for l in listings]
+
+
+def _by_id(listings):
+    return sorted(listings, key=lambda l: l['listing_id'])
+
+
+def _crossed(database):
+    return sorted((c['listing']['listing_id'], summary(c['matches'])) for c in cross_order_book(database))
+
+
+def test_seeds_dummy_data_and_matches_in_memory_backend():
+    sqlite_dm, memory_dm = SQLiteDataManager(), DataManager()
+    assert _by_id(sqlite_dm.export_listings()) == _by_id(memory_dm.export_listings())
+    for request_info, role in REQUESTS:
+        assert summary(find_best_matches(request_info, sqlite_dm, role)) == \
+            summary(find_best_matches(request_info, memory_dm, role))
+    assert _crossed(sqlite_dm) == _crossed(memory_dm)
+
+
+@pytest.mark.parametrize("descending", [False, True])
+def test_candidates_and_price_bands_match_in_memory_backend(descending):
+    sqlite_dm, memory_dm = SQLiteDataManager(), DataManager()
+    for bounds in [(None, None), (9.0, 10.0), (None, 10.0), (10.0, None)]:
+        assert _ids(sqlite_dm.iter_candidates("selling", "Apples", *bounds, descending=descending)) == \
+            _ids(memory_dm.iter_candidates("selling", "Apples", *bounds, descending=descending))
+
+
+def test_add_update_delete():
+    dm = SQLiteDataManager(listings=[])
+    listing = dm.add_listing({"user_id": "s1", "type": "selling", "product_name": "Rice",
+                              "quantity": 10.0, "unit": "kg", "price_per_unit": 40.0, "currency": "rupees"})
+    assert listing['listing_id'] == 1
+    assert dm.get_candidates("selling", "rice") == [listing]
+
+    updated = dm.update_listing(1, {"product_name": "wheat", "price_per_unit": 20.0})
+    assert dm.get_candidates("selling", "rice") == []
+    assert dm.get_candidates("selling", "wheat", max_price=25.0) == [updated]
+    assert updated['normalized'].base_price == 20.0
+
+    assert dm.delete_listing(1) == updated
+    assert dm.delete_listing(1) is None
+    assert dm.update_listing(1, {"quantity": 1.0}) is None
+
+
+def test_persists_bulk_import_across_connections(tmp_path):
+    path = str(tmp_path / "listings.sqlite3")
+    dm = SQLiteDataManager(path, listings=[])
+    assert dm.connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert dm.import_listings(database_listings) == len(database_listings)
+    dm.close()
+
+    reopened = SQLiteDataManager(path)
+    assert _by_id(reopened.export_listings()) == _by_id(DataManager().export_listings())
+    reopened.close()
+
+
+def test_only_memory_databases_are_seeded(tmp_path):
+    path = str(tmp_path / "listings.sqlite3")
+    dm = SQLiteDataManager(path)
+    assert dm.get_all_listings() == []
+    dm.close()
+
+    seeded = SQLiteDataManager(str(tmp_path / "demo.sqlite3"), seed=True)
+    assert len(seeded.get_all_listings()) == len(database_listings)
+    seeded.close()
+    assert SQLiteDataManager(seed=False).get_all_listings() == []
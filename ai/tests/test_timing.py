@@ -0,0 +1,75 @@
+import pstats
+
+import pytest
+
+from src.instrumentation import timing
+from src.instrumentation.timing import NO_TIMINGS, Histogram, PipelineProfiler, StageTimings
+from src.main import ChatSession, Chatbot
+
+from tests.conftest import CONFIG_PATH
+
+
+def test_histogram_percentiles_are_within_a_bucket():
+    histogram = Histogram()
+    for ms in range(1, 101):
+        histogram.record(ms / 1e3)
+
+    stats = histogram.stats()
+    assert stats['count'] == 100 and stats['max_ms'] == pytest.approx(100.0)
+    assert stats['mean_ms'] == pytest.approx(50.5)
+    assert 50.0 <= stats['p50_ms'] <= 50.0 * 1.19
+    assert 99.0 <= stats['p99_ms'] <= 100.0
+    assert Histogram().stats()['p99_ms'] == 0.0
+
+
+def test_stage_timings_record_each_stage():
+    timings = StageTimings()
+    for _ in range(3):
+        with timings.stage('extract'):
+            pass
+    timings.record('match', 0.002)
+
+    stats = timings.stats()
+    assert stats['extract']['count'] == 3
+    assert stats['match']['mean_ms'] == pytest.approx(2.0)
+    assert timings.report().splitlines()[1].startswith('extract')
+
+
+def test_timing_is_off_by_default(monkeypatch):
+    monkeypatch.delenv(timing.TIMINGS_ENV, raising=False)
+    monkeypatch.delenv(timing.PROFILE_ENV, raising=False)
+    chatbot = Chatbot(config_path=CONFIG_PATH, warm_up=False)
+    assert chatbot.timings is NO_TIMINGS and chatbot.profiler is None
+
+    chatbot.respond(ChatSession(), "buyer")
+    assert chatbot.timings.stats() == {}
+
+
+def test_environment_enables_timings_and_profiling(monkeypatch, tmp_path):
+    path = str(tmp_path / "turns.prof")
+    monkeypatch.setenv(timing.TIMINGS_ENV, "1")
+    monkeypatch.setenv(timing.PROFILE_ENV, path)
+    monkeypatch.setattr(timing.atexit, "register", lambda fn: None)
+    chatbot = Chatbot(config_path=CONFIG_PATH, warm_up=False)
+    assert chatbot.timings.enabled and chatbot.profiler.path == path
+
+    session = ChatSession()
+    chatbot.respond(session, "buyer")
+    chatbot.respond(session, "100 kg apples for 10 rupees per kg")
+    stats = chatbot.timings.stats()
+    assert stats['turn']['count'] == 2
+    assert stats['extract']['count'] == stats['match']['count'] == 1
+
+    chatbot.profiler.dump()
+    assert any(name == '_respond' for _, _, name in pstats.Stats(path).stats)
+
+
+def test_profiler_only_profiles_inside_its_block(tmp_path):
+    profiler = PipelineProfiler(str(tmp_path / "out.prof"))
+    with profiler:
+        sorted(range(10))
+    sum(range(10))
+    profiler.dump()
+    names = {name for _, _, name in pstats.Stats(profiler.path).stats}
+    assert "<built-in method builtins.sorted>" in names
+    assert "<built-in method builtins.sum>" not in names
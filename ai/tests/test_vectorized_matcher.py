@@ -0,0 +1,70 @@
+import random
+
+import numpy as np
+import pytest
+
+from src.database.columnar_store import ColumnarListingStore
+from src.database.dummy_data import database_listings
+from src.matching.matcher import find_best_matches, score_listing
+from src.matching.vectorized_matcher import find_best_matches_vectorized, score_rows
+
+from tests.conftest import summary
+
+PRODUCTS = ["apples", "Apples", " apples ", "rice", "rice ", "tea"]
+UNITS = ["kg", "KG", "gram", "lb", "liter", "milliliter", "dozen", "units", "bag", None, ""]
+CURRENCIES = ["rupees", "dollars", "Rupees", "eur", "aed", None]
+
+
+def _random_listings(rng, n):
+    return [{"listing_id": i, "user_id": f"u{i}", "type": rng.choice(["selling", "buying"]),
+             "product_name": rng.choice(PRODUCTS),
+             "quantity": rng.choice([None, 0.0, 0.1, 12.0, 50.0, 95.0, 100.0, 104.0, 110.0, 125.0, 150.0, 151.0,
+                                      300.0, 1000.0, 100000.0]),
+             "unit": rng.choice(UNITS),
+             "price_per_unit": rng.choice([0.0, 0.01, 0.12, 5.0, 9.5, 10.0, 10.5, 11.0, 12.0, 15.0, 16.0]),
+             "currency": rng.choice(CURRENCIES)} for i in range(n)]
+
+
+def _random_request(rng):
+    return {"product": rng.choice(PRODUCTS + ["mangoes"]),
+            "quantity": rng.choice([None, 100.0, 10.0]),
+            "unit": rng.choice(UNITS + ["ounce"]),
+            "price": rng.choice([None, 10.0, 12.5]),
+            "currency": rng.choice(CURRENCIES + ["eur"])}
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_scores_equal_reference(seed):
+    rng = random.Random(seed)
+    store = ColumnarListingStore(_random_listings(rng, 300))
+    rows = np.arange(len(store))
+    for _ in range(10):
+        request_info, role = _random_request(rng), rng.choice(["buyer", "seller"])
+        expected = [score_listing(l, request_info, role) for l in store.listings]
+        assert score_rows(store, rows, request_info, role).tolist() == expected
+
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("k", [1, 3, 25])
+def test_top_k_equal_reference(seed, k):
+    rng = random.Random(seed)
+    listings = _random_listings(rng, 500)
+    store = ColumnarListingStore(listings)
+    for _ in range(10):
+        request_info, role = _random_request(rng), rng.choice(["buyer", "seller"])
+        expected = find_best_matches(request_info, listings, role, k=k)
+        assert summary(find_best_matches_vectorized(request_info, store, role, k=k)) == summary(expected)
+
+
+def test_dummy_data_equal_reference():
+    store = ColumnarListingStore(database_listings)
+    request_info = {'product': 'apples', 'quantity': 100.0, 'unit': 'kg', 'price': 10.0, 'currency': 'rupees'}
+    matches = find_best_matches_vectorized(request_info, store, 'buyer')
+    assert summary(matches) == [(1, 10), (3, 8), (2, 5)]
+    assert matches[0]['listing'] is database_listings[0]
+
+
+def test_empty_store_and_missing_product():
+    store = ColumnarListingStore([])
+    assert find_best_matches_vectorized({'product': 'rice', 'price': 1.0}, store, 'buyer') == []
+    assert find_best_matches_vectorized({'product': None}, ColumnarListingStore(database_listings), 'buyer') == []